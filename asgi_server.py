@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+ASGI serving mode for the MCP server.
+
+Serves exactly the routes in server.py (MCP + legacy), but the network
+part of a request happens on the event loop: the Pokemon a request is
+going to need are worked out from its path/body and fetched from PokeAPI
+with httpx into the shared caches first, so thousands of lookups can be
+in flight in one process without a thread each. The Flask handler then
+runs in a thread pool, where it finds everything in memory and only
+spends CPU (simulations, serialization).
+
+    python asgi_server.py                 # uvicorn on :8080
+    uvicorn asgi_server:app --port 8080   # or any ASGI server
+
+Needs httpx and uvicorn (pip install httpx uvicorn).
+"""
+
+import asyncio
+import contextvars
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote
+
+import server
+from pokeapi_client import AsyncPokeAPIClient, PokeAPIError
+from pokemon_resource import (HEAVY_FIELDS, PokemonCore, build_record, cache, extras_cache, heavy_fields,
+                              key_index, not_found, not_found_lock, species_cache)
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+# most pokemon one request gets fetched up front - what a simulate_batch at the limit needs
+MAX_PREFETCH = 2 * server.MAX_BATCH_MATCHUPS
+
+class Prefetcher:
+    """Loads pokemon into PokemonResource's caches with async upstream calls.
+
+    Only the httpx calls are awaited on the event loop. The caches and the
+    pokedex store are SQLite underneath (disk reads, commits), so every
+    touch of them goes through a small thread pool instead of stalling
+    every other request in flight.
+    """
+
+    def __init__(self, client=None, threads=4):
+        self._client = client
+        self._inflight = {}  # (kind, key) -> task, so concurrent requests share one fetch
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi-cache")
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = AsyncPokeAPIClient(breaker=server.pokemon_api.client.breaker)
+        return self._client
+
+    async def _off_loop(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _once(self, key, make_coro):
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(make_coro())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller going away mustn't cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    async def pokemon(self, name, include=()):
+        key, pokemon_id, missing = await self._off_loop(self._plan, name, include)
+        if key is None:
+            return
+        if pokemon_id is None:
+            pokemon_id = await self._once(("core", key), lambda: self._load_core(key))
+            if pokemon_id is None:
+                return
+            missing = await self._off_loop(self._missing, pokemon_id, include)
+
+        jobs = []
+        if "extras" in missing:
+            jobs.append(self._once(("extras", pokemon_id), lambda: self._load_extras(pokemon_id)))
+        if "species" in missing:
+            jobs.append(self._once(("species", pokemon_id), lambda: self._load_species(pokemon_id)))
+        if jobs:
+            await asyncio.gather(*jobs)
+
+    # the methods below touch sqlite - they only ever run on self.executor
+
+    def _plan(self, name, include):
+        # -> (canonical key, usable cached id, lazy parts to fetch). key is None for a known 404
+        key = key_index.canonical(name)
+        with not_found_lock:
+            if key in not_found:
+                return None, None, ()
+        pokemon_id = key_index.resolve(key)
+        if pokemon_id is None or not cache.usable(pokemon_id):
+            return key, None, ()
+        return key, pokemon_id, self._missing(pokemon_id, include)
+
+    def _missing(self, pokemon_id, include):
+        missing = []
+        if any(field in HEAVY_FIELDS for field in include) and not extras_cache.usable(pokemon_id):
+            missing.append("extras")
+        if "species" in include and not species_cache.usable(pokemon_id):
+            missing.append("species")
+        return missing
+
+    def _in_store(self, key):
+        store = server.pokemon_api.store
+        return store is not None and store.get(key) is not None
+
+    def _save_core(self, key, poke):
+        if poke is None:
+            with not_found_lock:
+                not_found[key] = True
+            return None
+        record = build_record(poke, None)
+        core = PokemonCore.from_record(record)
+        cache.set(str(core.id), core)
+        extras_cache.set(str(core.id), heavy_fields(record))  # same response, no second fetch for sprites
+        key_index.add(core, key)
+        return str(core.id)
+
+    async def _load_core(self, key):
+        # -> pokemon id once it's cached, None if there's nothing to cache
+        if await self._off_loop(self._in_store, key):
+            return None  # local snapshot, the handler reads it without touching the network
+        try:
+            poke = await self.client.get_json(f"pokemon/{key}")
+        except PokeAPIError as e:
+            print(f"PokeAPI prefetch failed: {e}", file=sys.stderr)
+            return None  # handler falls back to the sync path (fails fast if the circuit is open)
+        return await self._off_loop(self._save_core, key, poke)
+
+    async def _load_extras(self, pokemon_id):
+        if await self._off_loop(self._in_store, pokemon_id):
+            return
+        try:
+            poke = await self.client.get_json(f"pokemon/{pokemon_id}")
+        except PokeAPIError as e:
+            print(f"PokeAPI prefetch failed: {e}", file=sys.stderr)
+            return
+        if poke is not None:
+            await self._off_loop(extras_cache.set, pokemon_id, heavy_fields(build_record(poke, None)))
+
+    async def _load_species(self, pokemon_id):
+        if await self._off_loop(self._in_store, pokemon_id):
+            return
+        try:
+            species_data = await self.client.get_json(f"pokemon-species/{pokemon_id}")
+        except PokeAPIError as e:
+            print(f"PokeAPI prefetch failed: {e}", file=sys.stderr)
+            return
+        await self._off_loop(species_cache.set, pokemon_id,
+                             {"species": species_data and species_data.get("evolution_chain")})
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+        self.executor.shutdown(wait=False)
+
+def _include(value):
+    try:
+        return server.parse_include(value)
+    except ValueError:
+        return ()
+
+def _side_name(poke):
+    return poke.get("name") if isinstance(poke, dict) else poke
+
+def wanted_pokemon(method, path, query, body):
+    """[(name, include)] a request to server.py is going to look up"""
+    args = parse_qs(query)
+    try:
+        data = json.loads(body) if body else {}
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    if path == "/mcp/tools/call":
+        tool, arguments = data.get("name"), data.get("arguments") or {}
+        if tool in ("simulate_battle", "compare_pokemon"):
+            return [(_side_name(arguments.get(side)), ()) for side in ("pokemon1", "pokemon2")]
+        if tool == "get_pokemon":
+            return [(arguments.get("name"), _include(arguments.get("include")))]
+        if tool == "simulate_batch" and isinstance(arguments.get("matchups"), list):
+            if len(arguments["matchups"]) > server.MAX_BATCH_MATCHUPS:
+                return []  # server.py rejects it without a lookup
+            return [(_side_name(m.get(side)), ()) for m in arguments["matchups"] if isinstance(m, dict)
+                    for side in ("pokemon1", "pokemon2")]
+
+    elif path == "/mcp/resources/read":
+        uri = data.get("uri", "")
+        if uri.startswith("pokemon://data/"):
+            name, _, uri_query = uri[len("pokemon://data/"):].partition("?")
+            return [(name, _include(parse_qs(uri_query).get("include", [None])[0]))]
+        if uri.startswith("pokemon://battle/"):
+            return [(name, ()) for name in uri[len("pokemon://battle/"):].split("/")]
+
+    elif path.startswith("/resources/pokemon/"):
+        return [(unquote(path[len("/resources/pokemon/"):]), _include(args.get("include", [None])[0]))]
+
+    elif path in ("/tools/simulate_battle", "/mcp/tools/simulate_battle/stream"):
+        if method == "GET":
+            return [(args.get(side, [None])[0], ()) for side in ("pokemon1", "pokemon2")]
+        return [(_side_name(data.get(side)), ()) for side in ("pokemon1", "pokemon2")]
+
+    return []
+
+def _environ(scope, body):
+    # the bits of PEP 3333 Flask/werkzeug use
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+_DONE = object()
+
+def _next_chunk(chunks):
+    return next(chunks, _DONE)
+
+async def call_flask(executor, scope, body, send):
+    """Run the Flask app for one request in the thread pool, streaming its body back chunk by chunk"""
+    loop = asyncio.get_running_loop()
+    started = {}
+    # every step of one response runs in the same context - flask's streamed responses keep
+    # the request context in contextvars, and the steps can land on different threads
+    context = contextvars.Context()
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+    def begin():
+        # werkzeug only calls start_response once the app has produced its response
+        iterable = server.app(_environ(scope, body), start_response)
+        chunks = iter(iterable)
+        return iterable, chunks, _next_chunk(chunks)
+
+    iterable, chunks, chunk = await loop.run_in_executor(executor, context.run, begin)
+    try:
+        await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        while chunk is not _DONE:
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            chunk = await loop.run_in_executor(executor, context.run, _next_chunk, chunks)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        if hasattr(iterable, "close"):
+            await loop.run_in_executor(executor, context.run, iterable.close)
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+class ASGIApp:
+    def __init__(self, threads=None):
+        # handler threads only ever do CPU work, the waiting happens in the prefetcher
+        threads = threads or int(os.environ.get("ASGI_THREADS", (os.cpu_count() or 1) * 4))
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi-handler")
+        self.prefetcher = Prefetcher()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            body = await _read_body(receive)
+            if body is None:
+                return  # client went away
+            wanted = wanted_pokemon(scope["method"], scope["path"],
+                                    scope.get("query_string", b"").decode("latin-1"), body)
+            # each distinct one once, and never more than a full batch's worth per request
+            names = list(dict.fromkeys((str(name), include) for name, include in wanted if name))[:MAX_PREFETCH]
+            if names:
+                await asyncio.gather(*(self.prefetcher.pokemon(name, include) for name, include in names))
+            await call_flask(self.executor, scope, body, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                server.start_warmup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.prefetcher.close()
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+app = ASGIApp()
+
+def main():
+    if uvicorn is None:
+        print("ASGI mode needs uvicorn: pip install uvicorn httpx", file=sys.stderr)
+        return 1
+    uvicorn.run(app, host=os.environ.get("HOST", "0.0.0.0"), port=int(os.environ.get("PORT", 8080)))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,88 @@
+"""
+Batched battle simulation for the simulate_batch tool.
+
+A batch is a list of matchups, each battled `repeat` times. Species are
+resolved by the caller beforehand (once per distinct name); the battles
+are cut into chunks and spread over a process pool that is kept alive
+between requests. Every battle gets its own battle index under the batch
+seed, so any single one can be replayed through simulate_battle.
+"""
+
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from battle_simulator import BattleSimulator
+from tournament import compact_record, worker_context
+
+CHUNK_SIZE = 250  # battles per pool task
+INLINE_BATTLES = 200  # smaller batches aren't worth the trip to another process
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _workers():
+    return int(os.environ.get("SIMULATE_BATCH_WORKERS", 0)) or os.cpu_count() or 1
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # made lazily inside a threaded server, same start method as the tournament pools
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=worker_context())
+        return _pool
+
+def _run_chunk(task):
+    # (seed, p1, p2, lv1, lv2, first battle index, battles, log_level) -> list of results
+    seed, p1, p2, lv1, lv2, first_index, count, log_level = task
+    sim = BattleSimulator(seed=seed)
+    return [sim.simulate(p1, p2, lv1, lv2, log_level, first_index + i) for i in range(count)]
+
+def run_batch(matchups, seed=None, log_level="none"):
+    """Battle every matchup -> one summary per matchup, in order.
+
+    matchups: dicts with pokemon1/pokemon2 (battle payloads), level1, level2
+    and repeat. Per-battle results are only included when log_level isn't
+    "none".
+    """
+    seed = BattleSimulator(seed=seed).seed
+    tasks, owners = [], []
+    next_index = 0
+    for i, matchup in enumerate(matchups):
+        repeat = matchup["repeat"]
+        for start in range(0, repeat, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, repeat - start)
+            tasks.append((seed, compact_record(matchup["pokemon1"]), compact_record(matchup["pokemon2"]),
+                          matchup["level1"], matchup["level2"], next_index + start, count, log_level))
+            owners.append(i)
+        next_index += repeat
+
+    if next_index <= INLINE_BATTLES or len(tasks) == 1 or _workers() == 1:
+        chunks = map(_run_chunk, tasks)
+    else:
+        chunks = _executor().map(_run_chunk, tasks)
+
+    battles = [[] for _ in matchups]
+    for i, chunk in zip(owners, chunks):
+        battles[i].extend(chunk)
+
+    summaries = []
+    for matchup, results in zip(matchups, battles):
+        name1, name2 = matchup["pokemon1"]["name"], matchup["pokemon2"]["name"]
+        # by side, not name - both sides can be the same species
+        sides = Counter(result["winner_side"] for result in results)
+        summary = {
+            "pokemon1": {"name": name1, "level": matchup["level1"]},
+            "pokemon2": {"name": name2, "level": matchup["level2"]},
+            "battles": len(results),
+            "pokemon1_wins": sides["pokemon1"],
+            "pokemon2_wins": sides["pokemon2"],
+            "draws": sides["draw"],
+            "avg_turns": sum(r["turns"] for r in results) / len(results),
+            "first_battle_index": results[0]["battle_index"]
+        }
+        if log_level != "none":
+            summary["results"] = results
+        summaries.append(summary)
+    return {"seed": seed, "matchups": summaries}
@@ -1,6 +1,15 @@
+import bisect
+import hashlib
+import itertools
 import math
 import random
-from copy import deepcopy
+from functools import lru_cache
+
+# numpy is only needed for the batched monte carlo mode
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # type effectiveness chart - kinda messy but works
 type_chart = {
@@ -24,6 +33,70 @@ type_chart = {
     "fairy": {"fighting":2.0, "dragon":2.0, "dark":2.0, "fire":0.5, "poison":0.5, "steel":0.5}
 }
 
+# compiled version of type_chart - built once at import so a lookup is just indexing
+# type ids follow the order of type_chart above
+TYPE_NAMES = tuple(type_chart)
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+NUM_TYPES = len(TYPE_NAMES)  # 18
+
+# TYPE_MATRIX[attack_id][defend_id] -> multiplier
+TYPE_MATRIX = tuple(
+    tuple(type_chart[attack].get(defend, 1.0) for defend in TYPE_NAMES)
+    for attack in TYPE_NAMES
+)
+
+# every single/dual type defender gets a combo id: 18 singles + 153 pairs = 171
+NUM_TYPE_COMBOS = NUM_TYPES * (NUM_TYPES + 1) // 2
+# extra id for attackers/defenders with no type we know about (always 1.0, like get_effectiveness used to do)
+NEUTRAL_TYPE = NUM_TYPES
+NEUTRAL_COMBO = NUM_TYPE_COMBOS
+
+def _combo_index(a, b):
+    # a <= b, single types are (a, a)
+    return a * NUM_TYPES - a * (a - 1) // 2 + (b - a)
+
+def _build_dual_type_table():
+    table = []
+    for attack in range(NUM_TYPES):
+        row = [1.0] * (NUM_TYPE_COMBOS + 1)
+        for a in range(NUM_TYPES):
+            for b in range(a, NUM_TYPES):
+                mult = TYPE_MATRIX[attack][a]
+                if b != a:
+                    mult *= TYPE_MATRIX[attack][b]
+                row[_combo_index(a, b)] = mult
+        table.append(tuple(row))
+    table.append(tuple([1.0] * (NUM_TYPE_COMBOS + 1)))  # NEUTRAL_TYPE attacker
+    return tuple(table)
+
+# DUAL_TYPE_TABLE[attack_id][combo_id] -> multiplier against the whole defender
+DUAL_TYPE_TABLE = _build_dual_type_table()
+
+def get_type_id(type_name):
+    """Integer id for a type name, NEUTRAL_TYPE if it isn't in the chart"""
+    return TYPE_IDS.get(str(type_name).lower(), NEUTRAL_TYPE)
+
+_combo_ids = {}
+
+def get_combo_id(types):
+    """Combo id for a defender's type list (order doesn't matter, unknown types are ignored)"""
+    key = tuple(types)
+    combo = _combo_ids.get(key)
+    if combo is None:
+        ids = sorted({get_type_id(t) for t in key} - {NEUTRAL_TYPE})
+        if not ids:
+            combo = NEUTRAL_COMBO
+        elif len(ids) == 1:
+            combo = _combo_index(ids[0], ids[0])
+        else:
+            combo = _combo_index(ids[0], ids[1])
+        _combo_ids[key] = combo
+    return combo
+
+def type_effectiveness(attack_type, combo_id):
+    """Multiplier for an attack type (name) against a defender combo id"""
+    return DUAL_TYPE_TABLE[TYPE_IDS.get(attack_type, NEUTRAL_TYPE)][combo_id]
+
 # moves and stuff - just added what I thought would work
 moves_db = {
     # basic normal moves
@@ -75,6 +148,26 @@ moves_db = {
     "stone_edge": {"power": 100, "type": "rock", "accuracy": 80, "category": "physical"},
 }
 
+# hardcoded moves for some popular pokemon (also the server's default cache warm-up list)
+SPECIAL_MOVES = {
+    'mewtwo': ['psychic', 'psybeam', 'confusion', 'hyper_beam'],  # legendary
+    'mew': ['psychic', 'confusion', 'psybeam', 'body_slam'], 
+    'pikachu': ['thunderbolt', 'thunder_shock', 'thunder', 'tackle'],  # mascot
+    'charizard': ['flamethrower', 'fire_blast', 'ember', 'body_slam'],
+    'blastoise': ['surf', 'water_gun', 'hydro_pump', 'body_slam'],  # water starter
+    'venusaur': ['solar_beam', 'razor_leaf', 'vine_whip', 'body_slam'],
+    'gengar': ['confusion', 'psybeam', 'tackle', 'body_slam'],
+    'alakazam': ['psychic', 'confusion', 'psybeam', 'tackle'],
+    'machamp': ['karate_chop', 'brick_break', 'close_combat', 'body_slam'],
+    'dragonite': ['body_slam', 'hyper_beam', 'tackle', 'flamethrower'],
+    'gyarados': ['surf', 'hydro_pump', 'body_slam', 'hyper_beam'],
+    'snorlax': ['body_slam', 'hyper_beam', 'tackle', 'surf'],
+    'lapras': ['surf', 'water_gun', 'hydro_pump', 'body_slam'],
+    'articuno': ['surf', 'water_gun', 'tackle', 'body_slam'],
+    'zapdos': ['thunderbolt', 'thunder', 'thunder_shock', 'body_slam'],
+    'moltres': ['flamethrower', 'fire_blast', 'ember', 'body_slam']
+}
+
 def get_moves(poke_data):
     # get moves for a pokemon - tried to make it smart
     types = [t.lower() for t in poke_data.get('types', ['normal'])]
@@ -83,29 +176,9 @@ def get_moves(poke_data):
     
     moves = []  # will store the moves here
     
-    # hardcoded moves for some popular pokemon
-    special_moves = {
-        'mewtwo': ['psychic', 'psybeam', 'confusion', 'hyper_beam'],  # legendary
-        'mew': ['psychic', 'confusion', 'psybeam', 'body_slam'], 
-        'pikachu': ['thunderbolt', 'thunder_shock', 'thunder', 'tackle'],  # mascot
-        'charizard': ['flamethrower', 'fire_blast', 'ember', 'body_slam'],
-        'blastoise': ['surf', 'water_gun', 'hydro_pump', 'body_slam'],  # water starter
-        'venusaur': ['solar_beam', 'razor_leaf', 'vine_whip', 'body_slam'],
-        'gengar': ['confusion', 'psybeam', 'tackle', 'body_slam'],
-        'alakazam': ['psychic', 'confusion', 'psybeam', 'tackle'],
-        'machamp': ['karate_chop', 'brick_break', 'close_combat', 'body_slam'],
-        'dragonite': ['body_slam', 'hyper_beam', 'tackle', 'flamethrower'],
-        'gyarados': ['surf', 'hydro_pump', 'body_slam', 'hyper_beam'],
-        'snorlax': ['body_slam', 'hyper_beam', 'tackle', 'surf'],
-        'lapras': ['surf', 'water_gun', 'hydro_pump', 'body_slam'],
-        'articuno': ['surf', 'water_gun', 'tackle', 'body_slam'],
-        'zapdos': ['thunderbolt', 'thunder', 'thunder_shock', 'body_slam'],
-        'moltres': ['flamethrower', 'fire_blast', 'ember', 'body_slam']
-    }
-    
     # check if we have custom moves for this pokemon
-    if name in special_moves:
-        return special_moves[name]
+    if name in SPECIAL_MOVES:
+        return list(SPECIAL_MOVES[name])
     
     # otherwise try to figure out moves from types
     main_type = types[0] if types else 'normal'
@@ -156,52 +229,56 @@ def get_moves(poke_data):
     
     return available_moves[:4]
 
-def pick_move(poke, opponent_types, moves):
-    # simple move selection - not perfect but works
-    import random
-    
-    good_moves = []
+def rank_moves(poke_types, opponent_types, moves):
+    """Score every known move once and sort best first -> ((move, score), ...)"""
+    poke_types = [t.lower() for t in poke_types]
+    combo = get_combo_id(opponent_types)
     
+    ranked = []
     for move in moves:
         if move not in moves_db:
             continue
-            
-        move_info = moves_db[move]
-        power = move_info['power']
-        move_type = move_info['type']
-        
-        # check type effectiveness
-        effectiveness = get_effectiveness(move_type, opponent_types)
         
-        # same type bonus
-        poke_types = [t.lower() for t in poke.get('types', [])]
-        same_type = move_type in poke_types
+        move_info = moves_db[move]
         
-        # basic scoring
-        score = power * effectiveness
-        if same_type:
-            score *= 1.5  # stab
+        # basic scoring - power x type effectiveness, x1.5 for stab
+        score = move_info['power'] * type_effectiveness(move_info['type'], combo)
+        if move_info['type'] in poke_types:
+            score *= 1.5
         
-        good_moves.append((move, score))
+        ranked.append((move, score))
     
-    if not good_moves:
+    # stable sort so ties keep moveset order
+    ranked.sort(key=lambda x: x[1], reverse=True)
+    return tuple(ranked)
+
+@lru_cache(maxsize=4096)
+def _cached_ranking(attacker, defender, moves, attacker_types, defender_types):
+    return rank_moves(attacker_types, defender_types, moves)
+
+def get_move_ranking(attacker, defender):
+    """Move ranking for a matchup of two BattlerStates, memoized per (attacker, defender, moveset)
+
+    Nothing about either side changes during a battle, so this gets built
+    once per battle and reused by later battles of the same pairing.
+    """
+    return _cached_ranking(attacker.name, defender.name, attacker.moves, attacker.types, defender.types)
+
+def choose_move(ranking, rng=random):
+    # usually best move but sometimes random
+    if not ranking:
         return 'tackle'  # fallback
-    
-    # sort and pick - usually best move but sometimes random
-    good_moves.sort(key=lambda x: x[1], reverse=True)
-    
-    if random.random() < 0.8:
-        return good_moves[0][0]  # best move
-    else:
-        return random.choice(good_moves)[0]  # random move
+    if rng.random() < 0.8:
+        return ranking[0][0]
+    return rng.choice(ranking)[0]
+
+def pick_move(poke, opponent_types, moves):
+    # simple move selection - not perfect but works
+    return choose_move(rank_moves(poke.get('types', []), opponent_types, moves))
 
 def get_effectiveness(attack_type, def_types):
-    # check how effective a move is
-    multiplier = 1.0
-    for def_type in def_types:
-        if attack_type in type_chart:
-            multiplier *= type_chart[attack_type].get(def_type.lower(), 1.0)
-    return multiplier
+    # check how effective a move is - uses the compiled table above
+    return type_effectiveness(attack_type, get_combo_id(def_types))
 
 def damage_formula(level, power, attack, defense, modifier):
     """Calculate damage using Pokemon damage formula (adjusted for longer battles)"""
@@ -218,111 +295,320 @@ def damage_formula(level, power, attack, defense, modifier):
     max_damage_cap = 35  # No single move can do more than 35 damage
     return min(final_damage, max_damage_cap)
 
-class BattleSimulator:
-    def __init__(self):
-        pass  # Remove seed for more realistic battles
+def _damage_base(level, power, attack, defense):
+    # same steps as damage_formula, before the modifier is applied
+    base = ((2*level)/5 + 2) * power * (attack / defense)
+    base = base / 50 + 2
+    return base * 0.4
+
+@lru_cache(maxsize=8192)
+def damage_distribution(level, power, attack, defense, modifier):
+    """Every damage a single hit can do, with its probability -> ((damage, probability), ...)
 
-    def simulate(self, p1, p2, lv1=50, lv2=50):
-        """Enhanced battle simulation with detailed move information"""
-        # Initialize Pokemon states with movesets and boosted HP
+    modifier is everything except the 0.85-1.0 random factor (stab, type
+    effectiveness, crit, burn). The max(1, .) floor and the 35 cap from
+    damage_formula are folded in, so this is the exact histogram of what
+    damage_formula returns as the random factor varies.
+    """
+    c = _damage_base(level, power, attack, defense) * modifier
+    if c <= 0:
+        return ((1, 1.0),)
+    lo, hi = 0.85 * c, c
+    hist = {}
+    for d in range(int(lo), int(hi) + 1):
+        # part of the roll range where floor(c * roll) == d
+        overlap = min(hi, d + 1) - max(lo, d)
+        if overlap > 0:
+            damage = min(max(d, 1), 35)
+            hist[damage] = hist.get(damage, 0.0) + overlap / (hi - lo)
+    return tuple(sorted(hist.items()))
+
+@lru_cache(maxsize=8192)
+def damage_table(level, power, attack, defense, modifier):
+    """damage_distribution as (damages, cumulative probabilities) for sampling"""
+    dist = damage_distribution(level, power, attack, defense, modifier)
+    return tuple(d for d, _ in dist), tuple(itertools.accumulate(p for _, p in dist))
+
+def roll_damage(table, rng=random):
+    # sample a damage_table with one uniform draw
+    damages, cumulative = table
+    i = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+    return damages[min(i, len(damages) - 1)]
+
+def _matchup_key(attacker, defender):
+    # everything about a matchup that damage depends on, as a hashable tuple
+    return (attacker.types, attacker.level, attacker.attack, attacker.special_attack,
+            defender.defense, defender.special_defense, defender.type_combo)
+
+def _hit_args(move_data, matchup, burn_mod=1.0):
+    types, level, attack, special_attack, defense, special_defense, combo = matchup
+    move_type = move_data["type"]
+    stab = 1.5 if move_type in types else 1.0
+    effectiveness = type_effectiveness(move_type, combo)
+    if move_data["category"] == "physical":
+        return level, move_data["power"], attack, defense, stab * effectiveness * burn_mod
+    return level, move_data["power"], special_attack, special_defense, stab * effectiveness * burn_mod
+
+def hit_args(attacker, defender, move_data, burn_mod=1.0):
+    """(level, power, attack, defense, modifier) for damage_distribution/damage_table, without crit"""
+    return _hit_args(move_data, _matchup_key(attacker, defender), burn_mod)
+
+def move_damage_tables(attacker, defender, move_data, burn_mod=1.0):
+    """(normal, critical) damage tables for one move of a matchup - indexable by the crit bool"""
+    level, power, attack, defense, modifier = hit_args(attacker, defender, move_data, burn_mod)
+    return (damage_table(level, power, attack, defense, modifier),
+            damage_table(level, power, attack, defense, modifier * 2.0))
+
+@lru_cache(maxsize=4096)
+def _cached_damage_tables(ranking, matchup):
+    tables = {}
+    for move, _ in ranking or (('tackle', 0),):
+        move_data = moves_db[move]
+        if move_data["category"] != "status":
+            level, power, attack, defense, modifier = _hit_args(move_data, matchup)
+            tables[move] = (damage_table(level, power, attack, defense, modifier),
+                            damage_table(level, power, attack, defense, modifier * 2.0))
+    return tables
+
+def build_damage_tables(attacker, defender):
+    """move -> (normal, critical) tables for every damaging move attacker might pick
+
+    Memoized per matchup like the move ranking, so repeat pairings reuse the
+    same tables. Treat the returned dict as read-only.
+    """
+    return _cached_damage_tables(attacker.ranking, _matchup_key(attacker, defender))
+
+def damage_preview(attacker, defender):
+    """Damage range of each of attacker's moves against defender, straight from the tables"""
+    preview = []
+    for move, _ in attacker.ranking or get_move_ranking(attacker, defender):
+        move_data = moves_db[move]
+        if move_data["category"] == "status":
+            continue
+        level, power, attack, defense, modifier = hit_args(attacker, defender, move_data)
+        normal = damage_distribution(level, power, attack, defense, modifier)
+        crit = damage_distribution(level, power, attack, defense, modifier * 2.0)
+        expected = sum(d * p for d, p in normal) * 0.9375 + sum(d * p for d, p in crit) * 0.0625
+        preview.append({
+            "move": move.replace('_', ' ').title(),
+            "min": normal[0][0],
+            "max": normal[-1][0],
+            "crit_max": crit[-1][0],
+            "expected": round(expected * move_data["accuracy"] / 100, 2),
+            "accuracy": move_data["accuracy"]
+        })
+    return preview
+
+def move_table(attacker, defender):
+    """Per-move numbers for one side of a matchup, best move first.
+
+    Returns (names, accuracy, is_heal, base, multiplier, best_index).
+    Moves missing from moves_db are skipped the same way pick_move skips
+    them, falling back to tackle if nothing is left.
+    """
+    ranking = get_move_ranking(attacker, defender) or (('tackle', 0),)
+    known = [move for move, _ in ranking]
+
+    accuracy, is_heal, base, multiplier = [], [], [], []
+    for move in known:
+        move_data = moves_db[move]
+        effectiveness = type_effectiveness(move_data['type'], defender.type_combo)
+        stab = 1.5 if move_data['type'] in attacker.types else 1.0
+
+        if move_data['category'] == 'physical':
+            attack_stat = attacker.attack
+            defense_stat = defender.defense
+        else:
+            attack_stat = attacker.special_attack
+            defense_stat = defender.special_defense
+
+        accuracy.append(move_data['accuracy'])
+        is_heal.append(move_data['category'] == 'status' and move in ['rest', 'recover', 'roost'])
+        base.append(_damage_base(attacker.level, move_data['power'], attack_stat, defense_stat))
+        multiplier.append(stab * effectiveness)
+
+    # ranking is already best first
+    return (known, np.array(accuracy), np.array(is_heal), np.array(base),
+            np.array(multiplier), 0)
+
+class BattlerState:
+    """Compact per-battle state built from a get_pokemon payload.
+
+    A battle only reads the name, types and six stats, so that's all we
+    keep (plus level, hp, status and moves) - no sprites or learnsets, and
+    nothing to deepcopy. Types are stored lowercased with their combo id
+    already resolved against DUAL_TYPE_TABLE.
+    """
+    __slots__ = (
+        "name", "types", "type_combo",
+        "base_hp", "attack", "defense", "special_attack", "special_defense", "speed",
+        "level", "hp", "max_hp", "status", "moves", "ranking", "damage_tables", "counters"
+    )
+
+    def __init__(self, poke, level=50):
+        stats = poke["stats"]
+        self.name = poke["name"]
+        self.types = tuple(t.lower() for t in poke.get("types", []))
+        self.type_combo = get_combo_id(self.types)
+        
+        self.base_hp = stats["hp"]
+        self.attack = stats["attack"]
+        self.defense = stats["defense"]
+        self.special_attack = stats["special-attack"]
+        self.special_defense = stats["special-defense"]
+        self.speed = stats["speed"]
+        
         # Double HP for much longer, strategic battles
-        hp1_boosted = int(p1["stats"]["hp"] * 2.0)
-        hp2_boosted = int(p2["stats"]["hp"] * 2.0)
+        self.level = level
+        self.max_hp = int(self.base_hp * 2.0)
+        self.hp = self.max_hp
+        self.status = None
+        self.moves = tuple(get_moves(poke))
+        self.ranking = ()
+        self.damage_tables = {}
+        self.counters = {"crits": 0, "misses": 0, "damage_dealt": 0, "super_effective": 0}
+
+# how much detail simulate puts in its result
+LOG_LEVELS = ("none", "summary", "full")
+
+def derive_seed(seed, index):
+    """Seed for sub-stream `index` of a root seed - same inputs, same stream, anywhere"""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+class BattleSimulator:
+    def __init__(self, seed=None):
+        # every battle gets its own generator derived from (seed, battle index),
+        # so runs are reproducible and never share state with the global random module.
+        # no seed -> pick a random root so battles still vary between simulators
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**32)
+        self._battle_counter = itertools.count()
+
+    def _next_index(self, battle_index):
+        return next(self._battle_counter) if battle_index is None else battle_index
+
+    def simulate(self, p1, p2, lv1=50, lv2=50, log_level="full", battle_index=None):
+        """Enhanced battle simulation with detailed move information
+
+        log_level picks how much comes back:
+          "none"    - winner, turns and final hp only
+          "summary" - plus per-pokemon counters (crits, misses, damage, super effective hits)
+          "full"    - plus the turn by turn log and movesets (default)
+
+        battle_index picks the random sub-stream; leave it out to take the
+        simulator's next one. The result carries seed and battle_index, and
+        passing both back replays the exact same battle.
+        """
+        turns = self.simulate_turns(p1, p2, lv1, lv2, log_level, battle_index)
+        log = []
+        while True:
+            try:
+                log.extend(next(turns))
+            except StopIteration as done:
+                result = done.value
+                break
+        if log_level == "full":
+            result["log"] = log
+        return result
+
+    def simulate_turns(self, p1, p2, lv1=50, lv2=50, log_level="full", battle_index=None):
+        """Generator form of simulate: with log_level "full" it yields each turn's
+        log entries as soon as the turn is played. The final result (without the
+        log) is the generator's return value.
+        """
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"log_level must be one of {', '.join(LOG_LEVELS)}")
+        full_log = log_level == "full"
+        battle_index = self._next_index(battle_index)
+        rng = random.Random(derive_seed(self.seed, battle_index))
         
-        state1 = {
-            "pokemon": deepcopy(p1), 
-            "hp": hp1_boosted,
-            "max_hp": hp1_boosted,
-            "level": lv1, 
-            "status": None,
-            "moves": get_moves(p1)
-        }
-        state2 = {
-            "pokemon": deepcopy(p2), 
-            "hp": hp2_boosted,
-            "max_hp": hp2_boosted,
-            "level": lv2, 
-            "status": None,
-            "moves": get_moves(p2)
-        }
+        # Only the bits of the payload a battle reads - no deepcopy of sprites/learnsets
+        state1 = BattlerState(p1, lv1)
+        state2 = BattlerState(p2, lv2)
+        
+        # movesets and types are fixed for the whole battle, so rank moves once
+        state1.ranking = get_move_ranking(state1, state2)
+        state2.ranking = get_move_ranking(state2, state1)
+        state1.damage_tables = build_damage_tables(state1, state2)
+        state2.damage_tables = build_damage_tables(state2, state1)
         
         turn = 0
-        log = []
         max_turns = 100  # Increased for longer, more strategic battles
         
-        while state1["hp"] > 0 and state2["hp"] > 0 and turn < max_turns:
+        while state1.hp > 0 and state2.hp > 0 and turn < max_turns:
             turn += 1
+            log = []  # this turn's entries only, handed out at the end of the turn
             
             # Speed check with random factor for variety
-            sp1 = p1["stats"]["speed"] * (0.5 if state1["status"]=="paralysis" else 1.0)
-            sp2 = p2["stats"]["speed"] * (0.5 if state2["status"]=="paralysis" else 1.0)
+            sp1 = state1.speed * (0.5 if state1.status=="paralysis" else 1.0)
+            sp2 = state2.speed * (0.5 if state2.status=="paralysis" else 1.0)
             
             # Add some randomness to speed ties
             if abs(sp1 - sp2) <= 5:  # Close speeds
-                first, second = (state1, state2) if random.random() < 0.5 else (state2, state1)
+                first, second = (state1, state2) if rng.random() < 0.5 else (state2, state1)
             else:
                 first, second = (state1, state2) if sp1 > sp2 else (state2, state1)
 
             # Each Pokemon's turn
             for actor, target in ((first, second), (second, first)):
-                if actor["hp"] <= 0 or target["hp"] <= 0:
+                if actor.hp <= 0 or target.hp <= 0:
                     break
                     
                 # Status condition checks
-                if actor["status"] == "paralysis" and random.random() < 0.25:
-                    log.append({
-                        "turn": turn, 
-                        "actor": actor["pokemon"]["name"], 
-                        "action": "paralyzed",
-                        "move": "(paralyzed)",
-                        "damage": 0,
-                        "target_hp": target["hp"],
-                        "effectiveness": 1.0,
-                        "critical": False
-                    })
+                if actor.status == "paralysis" and rng.random() < 0.25:
+                    if full_log:
+                        log.append({
+                            "turn": turn, 
+                            "actor": actor.name, 
+                            "action": "paralyzed",
+                            "move": "(paralyzed)",
+                            "damage": 0,
+                            "target_hp": target.hp,
+                            "effectiveness": 1.0,
+                            "critical": False
+                        })
                     continue
                 
                 # pick a move
-                selected_move = pick_move(
-                    actor["pokemon"], 
-                    target["pokemon"]["types"], 
-                    actor["moves"]
-                )
+                selected_move = choose_move(actor.ranking, rng)
                 
                 move_data = moves_db.get(selected_move,
                     {"power": 50, "type": "normal", "accuracy": 100, "category": "physical"})
                 
                 # Accuracy check
-                accuracy_roll = random.randint(1, 100)
+                accuracy_roll = rng.randint(1, 100)
                 if accuracy_roll > move_data["accuracy"]:
-                    log.append({
-                        "turn": turn,
-                        "actor": actor["pokemon"]["name"],
-                        "action": "missed",
-                        "move": selected_move.replace('_', ' ').title(),
-                        "damage": 0,
-                        "target_hp": target["hp"],
-                        "effectiveness": 1.0,
-                        "critical": False
-                    })
+                    actor.counters["misses"] += 1
+                    if full_log:
+                        log.append({
+                            "turn": turn,
+                            "actor": actor.name,
+                            "action": "missed",
+                            "move": selected_move.replace('_', ' ').title(),
+                            "damage": 0,
+                            "target_hp": target.hp,
+                            "effectiveness": 1.0,
+                            "critical": False
+                        })
                     continue
                 
                 # Handle healing/recovery moves
                 if move_data["category"] == "status" and selected_move in ["rest", "recover", "roost"]:
                     # Heal 50% of max HP
-                    heal_amount = actor["max_hp"] // 2
-                    actor["hp"] = min(actor["max_hp"], actor["hp"] + heal_amount)
+                    heal_amount = actor.max_hp // 2
+                    actor.hp = min(actor.max_hp, actor.hp + heal_amount)
                     
-                    log.append({
-                        "turn": turn,
-                        "actor": actor["pokemon"]["name"],
-                        "action": "heal",
-                        "move": selected_move.replace('_', ' ').title(),
-                        "damage": -heal_amount,  # Negative for healing
-                        "target_hp": actor["hp"],
-                        "effectiveness": 1.0,
-                        "critical": False
-                    })
+                    if full_log:
+                        log.append({
+                            "turn": turn,
+                            "actor": actor.name,
+                            "action": "heal",
+                            "move": selected_move.replace('_', ' ').title(),
+                            "damage": -heal_amount,  # Negative for healing
+                            "target_hp": actor.hp,
+                            "effectiveness": 1.0,
+                            "critical": False
+                        })
                     continue
                 
                 # Calculate damage
@@ -330,111 +616,257 @@ class BattleSimulator:
                 power = move_data["power"]
                 
                 # STAB (Same Type Attack Bonus)
-                stab = 1.5 if move_type in [t.lower() for t in actor["pokemon"]["types"]] else 1.0
+                stab = 1.5 if move_type in actor.types else 1.0
                 
                 # Type effectiveness
-                effectiveness = get_effectiveness(move_type, target["pokemon"]["types"])
+                effectiveness = type_effectiveness(move_type, target.type_combo)
                 
                 # Critical hit (6.25% chance)
-                critical = random.random() < 0.0625
-                critical_multiplier = 2.0 if critical else 1.0
+                critical = rng.random() < 0.0625
                 
                 # Status effect modifications
-                burn_mod = 0.5 if (actor["status"] == "burn" and move_data["category"] == "physical") else 1.0
-                
-                # Random factor (85-100% for variance)
-                random_factor = random.uniform(0.85, 1.0)
+                burn_mod = 0.5 if (actor.status == "burn" and move_data["category"] == "physical") else 1.0
                 
-                # Total damage modifier
-                modifier = stab * effectiveness * critical_multiplier * burn_mod * random_factor
+                # Damage comes from the move's precomputed roll table (85-100% random factor,
+                # floor and cap already folded in) - one uniform draw and a bisect
+                tables = actor.damage_tables.get(selected_move) if burn_mod == 1.0 else None
+                if tables is None:
+                    tables = move_damage_tables(actor, target, move_data, burn_mod)
+                damage = roll_damage(tables[critical], rng)
+                target.hp = max(0, target.hp - damage)
                 
-                # Select attack/defense stats based on move category
-                if move_data["category"] == "physical":
-                    attack_stat = actor["pokemon"]["stats"]["attack"]
-                    defense_stat = target["pokemon"]["stats"]["defense"]
-                else:  # special
-                    attack_stat = actor["pokemon"]["stats"]["special-attack"]
-                    defense_stat = target["pokemon"]["stats"]["special-defense"]
-                
-                # Calculate final damage
-                damage = damage_formula(actor["level"], power, attack_stat, defense_stat, modifier)
-                target["hp"] = max(0, target["hp"] - damage)
+                counters = actor.counters
+                counters["damage_dealt"] += damage
+                if critical:
+                    counters["crits"] += 1
+                if effectiveness > 1.0:
+                    counters["super_effective"] += 1
                 
                 # Log the move with detailed information
-                log.append({
-                    "turn": turn,
-                    "actor": actor["pokemon"]["name"],
-                    "move": selected_move.replace('_', ' ').title(),
-                    "move_type": move_type.title(),
-                    "power": power,
-                    "category": move_data["category"].title(),
-                    "damage": damage,
-                    "target_hp": target["hp"],
-                    "effectiveness": effectiveness,
-                    "critical": critical,
-                    "stab": stab > 1.0,
-                    "action": "attack"
-                })
+                if full_log:
+                    log.append({
+                        "turn": turn,
+                        "actor": actor.name,
+                        "move": selected_move.replace('_', ' ').title(),
+                        "move_type": move_type.title(),
+                        "power": power,
+                        "category": move_data["category"].title(),
+                        "damage": damage,
+                        "target_hp": target.hp,
+                        "effectiveness": effectiveness,
+                        "critical": critical,
+                        "stab": stab > 1.0,
+                        "action": "attack"
+                    })
                 
                 # Check if target fainted
-                if target["hp"] <= 0:
+                if target.hp <= 0:
                     break
             
             # Apply residual status damage
             for state in [state1, state2]:
-                if state["hp"] > 0:
+                if state.hp > 0:
                     residual_damage = 0
-                    if state["status"] == "poison":
-                        residual_damage = max(1, math.floor(state["pokemon"]["stats"]["hp"] * 0.0625))
-                        state["hp"] = max(0, state["hp"] - residual_damage)
-                        log.append({
-                            "turn": turn,
-                            "actor": state["pokemon"]["name"],
-                            "action": "poison_damage",
-                            "move": "(Poison)",
-                            "damage": residual_damage,
-                            "target_hp": state["hp"],
-                            "effectiveness": 1.0,
-                            "critical": False
-                        })
-                    elif state["status"] == "burn":
-                        residual_damage = max(1, math.floor(state["pokemon"]["stats"]["hp"] * 0.0625))
-                        state["hp"] = max(0, state["hp"] - residual_damage)
-                        log.append({
-                            "turn": turn,
-                            "actor": state["pokemon"]["name"],
-                            "action": "burn_damage",
-                            "move": "(Burn)",
-                            "damage": residual_damage,
-                            "target_hp": state["hp"],
-                            "effectiveness": 1.0,
-                            "critical": False
-                        })
+                    if state.status == "poison":
+                        residual_damage = max(1, math.floor(state.base_hp * 0.0625))
+                        state.hp = max(0, state.hp - residual_damage)
+                        if full_log:
+                            log.append({
+                                "turn": turn,
+                                "actor": state.name,
+                                "action": "poison_damage",
+                                "move": "(Poison)",
+                                "damage": residual_damage,
+                                "target_hp": state.hp,
+                                "effectiveness": 1.0,
+                                "critical": False
+                            })
+                    elif state.status == "burn":
+                        residual_damage = max(1, math.floor(state.base_hp * 0.0625))
+                        state.hp = max(0, state.hp - residual_damage)
+                        if full_log:
+                            log.append({
+                                "turn": turn,
+                                "actor": state.name,
+                                "action": "burn_damage",
+                                "move": "(Burn)",
+                                "damage": residual_damage,
+                                "target_hp": state.hp,
+                                "effectiveness": 1.0,
+                                "critical": False
+                            })
+            
+            if full_log:
+                yield log
             
             # Check for battle end
-            if state1["hp"] <= 0 or state2["hp"] <= 0:
+            if state1.hp <= 0 or state2.hp <= 0:
                 break
 
-        # Determine winner
-        if state1["hp"] > 0 and state2["hp"] <= 0:
-            winner = state1["pokemon"]["name"]
-        elif state2["hp"] > 0 and state1["hp"] <= 0:
-            winner = state2["pokemon"]["name"]
+        # Determine winner - by side too, names clash when a species fights itself
+        if state1.hp > 0 and state2.hp <= 0:
+            winner_side = "pokemon1"
+        elif state2.hp > 0 and state1.hp <= 0:
+            winner_side = "pokemon2"
         else:
-            winner = "draw" if state1["hp"] == state2["hp"] else (
-                state1["pokemon"]["name"] if state1["hp"] > state2["hp"] else state2["pokemon"]["name"]
+            winner_side = "draw" if state1.hp == state2.hp else (
+                "pokemon1" if state1.hp > state2.hp else "pokemon2"
             )
+        winner = {"pokemon1": state1.name, "pokemon2": state2.name}.get(winner_side, "draw")
 
-        return {
+        result = {
             "turns": turn, 
             "winner": winner, 
-            "log": log,
+            "winner_side": winner_side,
             "final_hp": {
-                state1["pokemon"]["name"]: state1["hp"],
-                state2["pokemon"]["name"]: state2["hp"]
+                state1.name: state1.hp,
+                state2.name: state2.hp
+            },
+            "seed": self.seed,
+            "battle_index": battle_index
+        }
+        
+        if log_level == "summary":
+            result["battle_stats"] = {
+                state1.name: state1.counters,
+                state2.name: state2.counters
+            }
+        elif full_log:
+            result["movesets"] = {
+                state1.name: [move.replace('_', ' ').title() for move in state1.moves],
+                state2.name: [move.replace('_', ' ').title() for move in state2.moves]
+            }
+        
+        return result
+
+    def simulate_many(self, p1, p2, n, lv1=50, lv2=50, battle_index=None):
+        """Run n independent battles at once and return aggregate results only.
+
+        Same rules as simulate (speed ties, 80/20 move choice, accuracy,
+        crits, the 0.85-1.0 roll and the 35 damage cap) but every battle is
+        a slot in a numpy array, so there is no per-battle log at all.
+        Status conditions are left out since nothing in simulate sets them.
+        The whole batch draws from one sub-stream (battle_index), so it
+        replays exactly given the same seed and index.
+        """
+        if np is None:
+            raise ImportError("simulate_many needs numpy - pip install numpy")
+        n = int(n)
+        if n < 1:
+            raise ValueError("n must be at least 1")
+
+        battle_index = self._next_index(battle_index)
+        rng = np.random.default_rng(derive_seed(self.seed, battle_index))
+        max_turns = 100
+
+        state1 = BattlerState(p1, lv1)
+        state2 = BattlerState(p2, lv2)
+        hp1_max = state1.max_hp
+        hp2_max = state2.max_hp
+        hp = np.empty((2, n), dtype=np.int64)
+        hp[0] = hp1_max
+        hp[1] = hp2_max
+        max_hp = (hp1_max, hp2_max)
+        turns = np.zeros(n, dtype=np.int64)
+
+        # side 0 is p1 attacking p2, side 1 is p2 attacking p1
+        sides = (
+            move_table(state1, state2),
+            move_table(state2, state1),
+        )
+
+        sp1 = state1.speed
+        sp2 = state2.speed
+        speed_tie = abs(sp1 - sp2) <= 5
+
+        def strike(side, idx):
+            # one action for `side` in each battle listed in idx
+            if idx.size == 0:
+                return
+            names, accuracy, is_heal, base, multiplier, best = sides[side]
+            m = idx.size
+
+            move = np.where(rng.random(m) < 0.8, best, rng.integers(0, len(names), m))
+            hit = rng.integers(1, 101, m) <= accuracy[move]
+            idx, move = idx[hit], move[hit]
+            m = idx.size
+
+            heal = is_heal[move]
+            if heal.any():
+                healed = idx[heal]
+                hp[side, healed] = np.minimum(max_hp[side], hp[side, healed] + max_hp[side] // 2)
+                idx, move = idx[~heal], move[~heal]
+                m = idx.size
+
+            critical = np.where(rng.random(m) < 0.0625, 2.0, 1.0)
+            random_factor = rng.uniform(0.85, 1.0, m)
+            modifier = multiplier[move] * critical * random_factor
+            damage = np.minimum(np.maximum(1, np.floor(base[move] * modifier)), 35).astype(np.int64)
+            target = 1 - side
+            hp[target, idx] = np.maximum(0, hp[target, idx] - damage)
+
+        live = np.arange(n)
+        turn = 0
+        while live.size and turn < max_turns:
+            turn += 1
+            turns[live] = turn
+
+            if speed_tie:
+                p1_first = rng.random(live.size) < 0.5
+            else:
+                p1_first = np.full(live.size, sp1 > sp2)
+
+            strike(0, live[p1_first])
+            strike(1, live[~p1_first])
+
+            # second mover only acts if both are still standing
+            alive = (hp[0, live] > 0) & (hp[1, live] > 0)
+            strike(1, live[p1_first & alive])
+            strike(0, live[~p1_first & alive])
+
+            live = live[(hp[0, live] > 0) & (hp[1, live] > 0)]
+
+        # same winner rules as simulate, including timeouts on hp
+        p1_wins = (hp[0] > hp[1])
+        p2_wins = (hp[1] > hp[0])
+        draws = n - int(p1_wins.sum()) - int(p2_wins.sum())
+
+        def hp_summary(values):
+            counts = np.bincount(values)
+            return {
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "min": int(values.min()),
+                "max": int(values.max()),
+                "histogram": {int(v): int(counts[v]) for v in np.flatnonzero(counts)}
+            }
+
+        turn_counts = np.bincount(turns)
+        return {
+            "battles": n,
+            "seed": self.seed,
+            "battle_index": battle_index,
+            "pokemon1": {
+                "name": state1.name,
+                "level": lv1,
+                "wins": int(p1_wins.sum()),
+                "win_rate": float(p1_wins.mean()),
+                "final_hp": hp_summary(hp[0]),
+                "moveset": [move.replace('_', ' ').title() for move in sides[0][0]]
+            },
+            "pokemon2": {
+                "name": state2.name,
+                "level": lv2,
+                "wins": int(p2_wins.sum()),
+                "win_rate": float(p2_wins.mean()),
+                "final_hp": hp_summary(hp[1]),
+                "moveset": [move.replace('_', ' ').title() for move in sides[1][0]]
             },
-            "movesets": {
-                state1["pokemon"]["name"]: [move.replace('_', ' ').title() for move in state1["moves"]],
-                state2["pokemon"]["name"]: [move.replace('_', ' ').title() for move in state2["moves"]]
+            "draws": draws,
+            "turns": {
+                "mean": float(turns.mean()),
+                "min": int(turns.min()),
+                "max": int(turns.max()),
+                "histogram": {int(t): int(turn_counts[t]) for t in np.flatnonzero(turn_counts)}
             }
         }
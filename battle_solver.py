@@ -0,0 +1,197 @@
+"""
+Exact win probabilities for a battle, no sampling.
+
+A battle in battle_simulator is a finite Markov chain over (hp1, hp2, turn):
+speed order (coin flip on near ties), the 80/20 move choice, accuracy, 1/16
+crits, the 0.85-1.0 damage roll, the max(1, .) floor and the 35 damage cap.
+solve_battle pushes the probability mass of that chain forward one half-turn
+at a time as an (hp1, hp2) array, collecting the mass that ends each turn,
+so P(win), P(draw) and the expected turn count come out exactly.
+"""
+
+from functools import lru_cache
+
+from battle_simulator import (BattleSimulator, BattlerState, damage_distribution, get_move_ranking,
+                              hit_args, moves_db, np)
+
+MAX_TURNS = 100  # same limit as BattleSimulator.simulate
+MAX_DAMAGE = 35
+CRIT_CHANCE = 0.0625
+
+class SolverBudgetExceeded(Exception):
+    """The chain has more hp states than the caller was willing to push mass through"""
+
+def _pmf(distribution):
+    # damage_distribution -> array indexed by damage
+    pmf = np.zeros(MAX_DAMAGE + 1)
+    for damage, probability in distribution:
+        pmf[damage] += probability
+    return pmf
+
+def action_distribution(attacker, defender):
+    """One action by attacker -> (p_nothing, p_heal, damage pmf)"""
+    ranking = get_move_ranking(attacker, defender) or (('tackle', 0),)
+    k = len(ranking)
+    p_nothing = p_heal = 0.0
+    damage = np.zeros(MAX_DAMAGE + 1)
+    for i, (move, _) in enumerate(ranking):
+        move_data = moves_db[move]
+        # pick_move: best move 80% of the time, otherwise uniform over all of them
+        weight = 0.2 / k + (0.8 if i == 0 else 0.0)
+        hit = min(move_data["accuracy"], 100) / 100
+        p_nothing += weight * (1 - hit)
+        if move_data["category"] == "status" and move in ["rest", "recover", "roost"]:
+            p_heal += weight * hit
+            continue
+        level, power, attack, defense, modifier = hit_args(attacker, defender, move_data)
+        damage += weight * hit * (
+            (1 - CRIT_CHANCE) * _pmf(damage_distribution(level, power, attack, defense, modifier))
+            + CRIT_CHANCE * _pmf(damage_distribution(level, power, attack, defense, modifier * 2.0))
+        )
+    return p_nothing, p_heal, damage
+
+def _half_turn(mass, action, max_hp, tol):
+    """Attacker on axis 0 acts against the target on axis 1 (only live states in mass)
+
+    Only the bounding box of the live mass is touched, and states left with
+    less than tol probability are dropped -> (new mass, dropped mass).
+    """
+    p_nothing, p_heal, damage = action
+    out = np.zeros_like(mass)
+    rows = np.flatnonzero(mass.any(axis=1))
+    cols = np.flatnonzero(mass.any(axis=0))
+    if not rows.size:
+        return out, 0.0
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    box = mass[r0:r1, c0:c1]
+
+    out[r0:r1, c0:c1] = box * p_nothing
+    touched = r1  # rows the tol sweep below has to look at
+    if p_heal:
+        heal = max_hp // 2
+        # rows below `capped` heal by the full amount, the rest stop at max_hp
+        capped = min(r1, max(r0, max_hp - heal))
+        out[r0 + heal:capped + heal, c0:c1] += p_heal * box[:capped - r0]
+        out[max_hp, c0:c1] += p_heal * box[capped - r0:].sum(axis=0)
+        touched = max_hp + 1
+
+    # cumulative mass along the target's hp, for everything a hit knocks out
+    below = np.cumsum(box, axis=1)
+    for d in np.flatnonzero(damage):
+        q = damage[d]
+        if d >= c0:
+            out[r0:r1, 0] += q * below[:, min(d, c1 - 1) - c0]
+        lo = max(c0, d + 1)
+        if lo < c1:
+            out[r0:r1, lo - d:c1 - d] += q * box[:, lo - c0:]
+
+    dropped = 0.0
+    if tol:
+        window = out[r0:touched]
+        tiny = (window > 0) & (window < tol)
+        dropped = float(window[tiny].sum())
+        window[tiny] = 0.0
+    return out, dropped
+
+def _play_turn(mass, first, actions, max_hps, tol):
+    """One turn with side `first` moving first -> (live mass, won by side 0, won by side 1, dropped)"""
+    won = [0.0, 0.0]
+    dropped = 0.0
+    for side in (first, 1 - first):
+        # view the array with the acting side on axis 0
+        view = mass if side == 0 else mass.T
+        view, lost = _half_turn(view, actions[side], max_hps[side], tol)
+        won[side] += view[:, 0].sum()
+        view[:, 0] = 0.0
+        dropped += lost
+        mass = view if side == 0 else view.T
+    return mass, won[0], won[1], dropped
+
+@lru_cache(maxsize=1024)
+def _solve(tie, p1_first, actions, max_hps, tol, max_states):
+    # memoized on the chain's parameters - the actions come in as tuples and turn back into arrays here
+    actions = tuple((a, b, np.array(c)) for a, b, c in actions)
+    mass = np.zeros((max_hps[0] + 1, max_hps[1] + 1))
+    mass[max_hps[0], max_hps[1]] = 1.0
+
+    win1 = win2 = expected_turns = dropped = 0.0
+    turn = 0
+    states = 0  # (hp1, hp2) cells the turns have had to work through, ~3M/sec
+    while turn < MAX_TURNS and mass.any():
+        turn += 1
+        if max_states:
+            rows = np.flatnonzero(mass.any(axis=1))
+            cols = np.flatnonzero(mass.any(axis=0))
+            states += (rows[-1] - rows[0] + 1) * (cols[-1] - cols[0] + 1)
+            if states > max_states:
+                raise SolverBudgetExceeded(f"more than {max_states} states after {turn} turns")
+        if tie:
+            a, w1a, w2a, lost_a = _play_turn(mass * 0.5, 0, actions, max_hps, tol)
+            b, w1b, w2b, lost_b = _play_turn(mass * 0.5, 1, actions, max_hps, tol)
+            mass, w1, w2, lost = a + b, w1a + w1b, w2a + w2b, lost_a + lost_b
+        else:
+            mass, w1, w2, lost = _play_turn(mass, 0 if p1_first else 1, actions, max_hps, tol)
+        dropped += lost
+        win1 += w1
+        win2 += w2
+        expected_turns += turn * (w1 + w2)
+        
+        # whatever is still going is below the tolerance - stop here
+        if tol and mass.sum() < tol:
+            dropped += float(mass.sum())
+            mass[:] = 0.0
+
+    # out of turns - higher hp wins, equal hp is a draw
+    if mass.any():
+        hp1 = np.arange(mass.shape[0])[:, None]
+        hp2 = np.arange(mass.shape[1])[None, :]
+        win1 += mass[hp1 > hp2].sum()
+        win2 += mass[hp2 > hp1].sum()
+        expected_turns += turn * mass.sum()
+    draw = mass[np.arange(mass.shape[0])[:, None] == np.arange(mass.shape[1])[None, :]].sum()
+    return float(win1), float(win2), float(draw), float(expected_turns), dropped
+
+def solve_battle(p1, p2, lv1=50, lv2=50, tol=1e-15, max_states=None):
+    """Exact P(win) for each side, P(draw) and expected turns for simulate's battle
+
+    States whose probability falls under tol are dropped as the mass spreads
+    out (tol=0 keeps everything); the total dropped is returned as
+    dropped_mass so the precision is always visible. max_states bounds the
+    work (long high-hp battles can take seconds): past it SolverBudgetExceeded
+    is raised instead.
+    """
+    if np is None:
+        raise ImportError("solve_battle needs numpy - pip install numpy")
+    state1 = BattlerState(p1, lv1)
+    state2 = BattlerState(p2, lv2)
+
+    def as_key(action):
+        p_nothing, p_heal, damage = action
+        return p_nothing, p_heal, tuple(damage.tolist())
+
+    actions = (as_key(action_distribution(state1, state2)),
+               as_key(action_distribution(state2, state1)))
+    tie = abs(state1.speed - state2.speed) <= 5
+    win1, win2, draw, turns, dropped = _solve(
+        tie, state1.speed > state2.speed, actions, (state1.max_hp, state2.max_hp), tol, max_states
+    )
+    return {
+        "pokemon1": {"name": state1.name, "level": lv1, "win_probability": win1},
+        "pokemon2": {"name": state2.name, "level": lv2, "win_probability": win2},
+        "draw_probability": draw,
+        "expected_turns": turns,
+        "dropped_mass": dropped
+    }
+
+def sample_battle(p1, p2, lv1=50, lv2=50, battles=2000, seed=0):
+    """Same shape as solve_battle, estimated from simulate_many instead (fixed seed, so it's repeatable)"""
+    result = BattleSimulator(seed=seed).simulate_many(p1, p2, battles, lv1, lv2, battle_index=0)
+    return {
+        "pokemon1": {"name": result["pokemon1"]["name"], "level": lv1,
+                     "win_probability": result["pokemon1"]["win_rate"]},
+        "pokemon2": {"name": result["pokemon2"]["name"], "level": lv2,
+                     "win_probability": result["pokemon2"]["win_rate"]},
+        "draw_probability": result["draws"] / battles,
+        "expected_turns": result["turns"]["mean"],
+        "sampled_battles": battles
+    }
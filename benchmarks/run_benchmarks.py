@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the battle simulator and the server hot paths.
+
+Pokemon come from fixtures/pokemon.json (same shape as
+PokemonResource.get_pokemon) instead of PokeAPI, so this runs with no
+network. Results are printed as JSON.
+
+    python benchmarks/run_benchmarks.py                          # run and print
+    python benchmarks/run_benchmarks.py --save baseline.json     # run and store a baseline
+    python benchmarks/run_benchmarks.py --baseline baseline.json # compare, exit 1 on regressions
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import cycle
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from battle_simulator import BattleSimulator, get_effectiveness, get_moves, np, pick_move  # noqa: E402
+from pokemon_resource import EXTRA_FIELDS, RecordVersion  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "pokemon.json"
+
+class FixturePokemon:
+    """Stands in for PokemonResource - serves the bundled fixtures"""
+
+    def __init__(self, path=FIXTURES):
+        with open(path) as f:
+            self.pokemon = json.load(f)
+        self.loaded_at = time.time()
+
+    def get_pokemon(self, name, include=()):
+        # core record plus the requested heavy fields, like PokemonResource
+        poke = self.pokemon.get(str(name).strip().lower())
+        if poke is None:
+            return None
+        return {k: v for k, v in poke.items() if k not in EXTRA_FIELDS or k in include}
+
+    def get_pokemon_many(self, names, include=(), return_errors=False):
+        return [self.get_pokemon(name, include) for name in names]
+
+    def version(self, name, include=()):
+        # fixtures never change, so one version for as long as they're loaded
+        if str(name).strip().lower() not in self.pokemon:
+            return None
+        return RecordVersion(self.loaded_at, 3600.0, 86400.0)
+
+def _rate(fn, min_time):
+    """Calls per second of fn(), run for at least min_time seconds"""
+    fn()  # warm up caches
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for _ in range(10):
+            fn()
+        calls += 10
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def _pairs(pokemon):
+    roster = list(pokemon.values())
+    return [(a, b) for a in roster for b in roster if a is not b]
+
+def bench_simulate(fixtures, min_time):
+    sim = BattleSimulator(seed=0)
+    results = {}
+    for log_level in ("full", "summary", "none"):
+        pairs = cycle(_pairs(fixtures.pokemon))
+        results[f"{log_level}_battles_per_sec"] = _rate(
+            lambda: sim.simulate(*next(pairs), log_level=log_level), min_time
+        )
+
+    # allocation pressure: peak traced memory while one battle runs, and what
+    # the returned result still holds on to afterwards
+    p1, p2 = _pairs(fixtures.pokemon)[0]
+    for log_level in ("full", "none"):
+        sim.simulate(p1, p2, log_level=log_level)
+        tracemalloc.start()
+        result = sim.simulate(p1, p2, log_level=log_level)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        results[f"{log_level}_peak_bytes_per_battle"] = peak
+        results[f"{log_level}_retained_bytes_per_battle"] = retained
+    return results
+
+def bench_simulate_many(fixtures, min_time):
+    if np is None:
+        return {"skipped": "numpy not installed"}
+    sim = BattleSimulator(seed=0)
+    pairs = cycle(_pairs(fixtures.pokemon))
+    batch = 1000
+    return {"battles_per_sec": _rate(lambda: sim.simulate_many(*next(pairs), batch), min_time) * batch}
+
+def bench_get_moves(fixtures, min_time):
+    roster = cycle(fixtures.pokemon.values())
+    return {"calls_per_sec": _rate(lambda: get_moves(next(roster)), min_time)}
+
+def bench_pick_move(fixtures, min_time):
+    cases = cycle([(a, b["types"], get_moves(a)) for a, b in _pairs(fixtures.pokemon)])
+    return {"calls_per_sec": _rate(lambda: pick_move(*next(cases)), min_time)}
+
+def bench_get_effectiveness(fixtures, min_time):
+    cases = cycle([(move_type, poke["types"])
+                   for poke in fixtures.pokemon.values()
+                   for move_type in ("fire", "water", "grass", "electric", "normal", "psychic")])
+    return {"calls_per_sec": _rate(lambda: get_effectiveness(*next(cases)), min_time)}
+
+def bench_server(fixtures, min_time):
+    import server
+    server.pokemon_api = fixtures
+    client = server.app.test_client()
+
+    calls = {
+        "simulate_battle": {"pokemon1": {"name": "pikachu", "level": 50},
+                            "pokemon2": {"name": "charizard", "level": 50}},
+        "get_pokemon": {"name": "mewtwo"},
+        "compare_pokemon": {"pokemon1": "blastoise", "pokemon2": "venusaur"},
+    }
+    results = {}
+    for tool, arguments in calls.items():
+        payload = {"name": tool, "arguments": arguments}
+
+        def call():
+            resp = client.post("/mcp/tools/call", json=payload)
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+
+        results[f"{tool}_requests_per_sec"] = _rate(call, min_time)
+
+        if tool in ("get_pokemon", "compare_pokemon"):
+            # fixture versions never change, so the rate above is all response cache hits -
+            # this one rebuilds and re-serializes every time
+            def call_uncached():
+                server.response_cache.clear()
+                call()
+
+            results[f"{tool}_uncached_requests_per_sec"] = _rate(call_uncached, min_time)
+    return results
+
+BENCHMARKS = {
+    "simulate": bench_simulate,
+    "simulate_many": bench_simulate_many,
+    "get_moves": bench_get_moves,
+    "pick_move": bench_pick_move,
+    "get_effectiveness": bench_get_effectiveness,
+    "server_tools_call": bench_server,
+}
+
+def run(names, min_time):
+    fixtures = FixturePokemon()
+    results = {}
+    for name in names:
+        results[name] = BENCHMARKS[name](fixtures, min_time)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+def _higher_is_better(metric):
+    return metric.endswith("_per_sec")
+
+def compare(current, baseline, threshold):
+    """Per-metric change against a stored run -> (comparison, any regressions)"""
+    comparison = {}
+    regressed = False
+    for bench, metrics in current["results"].items():
+        old_metrics = baseline.get("results", {}).get(bench, {})
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if _higher_is_better(metric) else change
+            regression = worse > threshold
+            regressed = regressed or regression
+            comparison.setdefault(bench, {})[metric] = {
+                "baseline": old,
+                "current": value,
+                "change_pct": round(change * 100, 1),
+                "regression": regression
+            }
+    return comparison, regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline simulator/server benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per measurement")
+    parser.add_argument("--save", help="write results to this file as a baseline")
+    parser.add_argument("--baseline", help="compare against a saved run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    current = run(args.only or list(BENCHMARKS), args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if not args.baseline:
+        print(json.dumps(current, indent=2))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    comparison, regressed = compare(current, baseline, args.threshold)
+    print(json.dumps({**current, "comparison": comparison, "regressed": regressed}, indent=2))
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    exit(main())
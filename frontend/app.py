@@ -31,61 +31,8 @@ server_url = "http://localhost:8080"
 backend_url = "http://127.0.0.1:5000"  # backup
 json_headers = {"Content-Type": "application/json"}
 
-# pokemon names - got this list online somewhere
-pokemon_list = [
-    # gen 1 stuff
-    "bulbasaur", "ivysaur", "venusaur", "charmander", "charmeleon", "charizard",
-    "squirtle", "wartortle", "blastoise", "caterpie", "metapod", "butterfree",
-    "weedle", "kakuna", "beedrill", "pidgey", "pidgeotto", "pidgeot",
-    "rattata", "raticate", "spearow", "fearow", "ekans", "arbok",
-    "pikachu", "raichu", "sandshrew", "sandslash", "nidoran-f", "nidorina",
-    "nidoqueen", "nidoran-m", "nidorino", "nidoking", "clefairy", "clefable",
-    "vulpix", "ninetales", "jigglypuff", "wigglytuff", "zubat", "golbat",
-    "oddish", "gloom", "vileplume", "paras", "parasect", "venonat",
-    "venomoth", "diglett", "dugtrio", "meowth", "persian", "psyduck",
-    "golduck", "mankey", "primeape", "growlithe", "arcanine", "poliwag",
-    "poliwhirl", "poliwrath", "abra", "kadabra", "alakazam", "machop",
-    "machoke", "machamp", "bellsprout", "weepinbell", "victreebel", "tentacool",
-    "tentacruel", "geodude", "graveler", "golem", "ponyta", "rapidash",
-    "slowpoke", "slowbro", "magnemite", "magneton", "farfetchd", "doduo",
-    "dodrio", "seel", "dewgong", "grimer", "muk", "shellder",
-    "cloyster", "gastly", "haunter", "gengar", "onix", "drowzee",
-    "hypno", "krabby", "kingler", "voltorb", "electrode", "exeggcute",
-    "exeggutor", "cubone", "marowak", "hitmonlee", "hitmonchan", "lickitung",
-    "koffing", "weezing", "rhyhorn", "rhydon", "chansey", "tangela",
-    "kangaskhan", "horsea", "seadra", "goldeen", "seaking", "staryu",
-    "starmie", "mr-mime", "scyther", "jynx", "electabuzz", "magmar",
-    "pinsir", "tauros", "magikarp", "gyarados", "lapras", "ditto",
-    "eevee", "vaporeon", "jolteon", "flareon", "porygon", "omanyte",
-    "omastar", "kabuto", "kabutops", "aerodactyl", "snorlax", "articuno",
-    "zapdos", "moltres", "dratini", "dragonair", "dragonite", "mewtwo", "mew",
-    
-    # Generation 2 (Johto) - Popular ones
-    "chikorita", "bayleef", "meganium", "cyndaquil", "quilava", "typhlosion",
-    "totodile", "croconaw", "feraligatr", "crobat", "lanturn", "togetic",
-    "ampharos", "umbreon", "espeon", "slowking", "forretress", "steelix",
-    "scizor", "heracross", "corsola", "skarmory", "kingdra", "donphan",
-    "porygon2", "tyrogue", "hitmontop", "smoochum", "elekid", "magby",
-    "miltank", "blissey", "raikou", "entei", "suicune", "larvitar",
-    "pupitar", "tyranitar", "lugia", "ho-oh", "celebi",
-    
-    # Generation 3 (Hoenn) - Popular ones  
-    "treecko", "grovyle", "sceptile", "torchic", "combusken", "blaziken",
-    "mudkip", "marshtomp", "swampert", "gardevoir", "slaking", "aggron",
-    "meditite", "medicham", "manectric", "plusle", "minun", "flygon",
-    "altaria", "lunatone", "solrock", "whiscash", "crawdaunt", "claydol",
-    "cradily", "armaldo", "milotic", "absol", "salamence", "metagross",
-    "regirock", "regice", "registeel", "latios", "latias", "kyogre",
-    "groudon", "rayquaza", "jirachi", "deoxys"
-]
-
-# Popular Pokemon for quick suggestions
-POPULAR_POKEMON = [
-    "pikachu", "charizard", "blastoise", "venusaur", "mewtwo", "mew",
-    "gengar", "alakazam", "machamp", "dragonite", "snorlax", "lapras",
-    "gyarados", "eevee", "lucario", "garchomp", "rayquaza", "metagross",
-    "salamence", "tyranitar", "lugia", "ho-oh", "kyogre", "groudon"
-]
+# pokemon names - shared with the server's cache warm-up
+from roster import POPULAR_POKEMON, pokemon_list
 
 # Voice Recognition Functions
 def extract_pokemon_names(text):
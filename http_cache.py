@@ -0,0 +1,111 @@
+"""
+HTTP caching for the deterministic Pokemon responses.
+
+Pokemon data, battle previews and compare_pokemon only depend on the
+cached records they're built from, so those responses get:
+
+- an ETag (hash of the encoded body) and Last-Modified (when the newest
+  record behind it was fetched). A request whose If-None-Match /
+  If-Modified-Since still matches gets an empty 304.
+- Cache-Control tied to PokemonResource's TTLs: max-age until the
+  records go stale, stale-while-revalidate for the stale window.
+- a server-side cache of the encoded body, keyed by the normalized
+  request and the representation (json/msgpack, pretty). It's only used
+  while the records' versions are unchanged and still fresh, so a refetch
+  invalidates it and hot responses skip building + re-serializing.
+"""
+
+import hashlib
+import os
+import threading
+
+from cachetools import LRUCache
+from flask import Response, request
+
+from serialization import encode, representation
+
+class ResponseCache:
+    def __init__(self, maxsize=1000):
+        self.entries = LRUCache(maxsize=maxsize)  # (key, representation) -> (version, body, etag)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # cachetools caches aren't thread safe
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def set(self, key, version, body, etag):
+        with self._lock:
+            self.entries[key] = (version, body, etag)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+response_cache = ResponseCache(int(os.environ.get("RESPONSE_CACHE_SIZE", 1000)))
+
+def _combine(versions):
+    # RecordVersions of every record in a response -> one for the response, None if any isn't cached
+    if not versions or None in versions:
+        return None
+    return (tuple(v.fetched_at for v in versions), max(v.fetched_at for v in versions),
+            min(v.fresh_for for v in versions), min(v.stale_for for v in versions))
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+def cached_response(key, versions, build):
+    """Response for a request that's a pure function of some cached Pokemon records.
+
+    key: the normalized request. versions(): RecordVersions of the records
+    it reads (PokemonResource.version), checked before and after a build.
+    build(): the payload to encode, or a flask return value for errors,
+    which is passed through and never cached.
+    """
+    rep = representation()
+    cache_key = (key, rep)
+    version = _combine(versions())
+    # once a record is stale, build again - get_pokemon is what starts its background refresh
+    fresh = version is not None and version[2] > 0
+    entry = response_cache.get(cache_key, version[0] if fresh else None)
+    if entry is not None:
+        _, body, etag = entry
+    else:
+        payload = build()
+        if not isinstance(payload, dict):
+            return payload
+        body = encode(payload, rep)
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        built_from = version
+        version = _combine(versions())
+        # only keep it if no record was refetched while we were building
+        if version is not None and (built_from is None or built_from[0] == version[0]):
+            response_cache.set(cache_key, version[0], body, etag)
+
+    last_modified = version[1] if version else None
+    if _not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=rep[0])
+    response.vary.add("Accept")
+    response.set_etag(etag)
+    if version is not None:
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = f"public, max-age={int(version[2])}, stale-while-revalidate={int(version[3])}"
+    else:
+        response.headers["Cache-Control"] = "no-cache"  # built from records we couldn't version
+    return response
@@ -0,0 +1,199 @@
+"""
+Pooled HTTP client for PokeAPI.
+
+One keep-alive requests.Session shared by every lookup, so the TCP/TLS
+handshake is paid once per pooled connection instead of once per call.
+Every request has a timeout, and 5xx responses / connection errors are
+retried with jittered exponential backoff. The base URL is configurable
+so the server can point at a local mirror or a stand-in. A circuit breaker
+stops calling upstream for a while after repeated failures.
+AsyncPokeAPIClient does the same on httpx for the ASGI server.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx  # only needed for AsyncPokeAPIClient (asgi_server.py)
+except ImportError:
+    httpx = None
+
+DEFAULT_BASE_URL = "https://pokeapi.co/api/v2"
+
+class PokeAPIError(Exception):
+    """Upstream didn't give a usable answer after all retries"""
+
+class RetryableError(PokeAPIError):
+    """5xx/429 - worth another attempt"""
+
+class CircuitOpenError(PokeAPIError):
+    """Breaker is open - upstream wasn't called at all"""
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures, lets one probe through after `reset_timeout` seconds"""
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True  # half-open: this caller is the probe
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()  # (re)open, failed probe restarts the wait
+            self._probing = False
+
+def read_response(url, status_code, parse_json):
+    """200 -> parsed json, 404 -> None. Raises RetryableError for 5xx/429, PokeAPIError for anything else"""
+    if status_code == 200:
+        try:
+            return parse_json()
+        except ValueError as e:
+            raise PokeAPIError(f"bad json from {url}") from e
+    if status_code == 404:
+        return None
+    if status_code >= 500 or status_code == 429:
+        raise RetryableError(f"{url} returned {status_code}")
+    raise PokeAPIError(f"{url} returned {status_code}")  # not worth retrying
+
+class _ClientSettings:
+    # base url, timeouts, retries and breaker shared by the sync and async clients
+    def __init__(self, base_url=None, timeout=None, retries=None, backoff=0.25, breaker=None):
+        self.base_url = (base_url or os.environ.get("POKEAPI_URL", DEFAULT_BASE_URL)).rstrip("/")
+        # (connect, read) seconds
+        timeout = timeout if timeout is not None else float(os.environ.get("POKEAPI_TIMEOUT", 5))
+        self.timeout = timeout if isinstance(timeout, tuple) else (min(timeout, 3.05), timeout)
+        self.retries = retries if retries is not None else int(os.environ.get("POKEAPI_RETRIES", 3))
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(
+            threshold=int(os.environ.get("POKEAPI_BREAKER_THRESHOLD", 5)),
+            reset_timeout=float(os.environ.get("POKEAPI_BREAKER_RESET", 30))
+        )
+
+    def _url(self, path):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"circuit open, not calling {url}")
+        return url
+
+    def _delay(self, attempt):
+        # full jitter: anywhere between 0 and backoff * 2^attempt
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _give_up(self, url, error):
+        return PokeAPIError(f"giving up on {url} after {self.retries + 1} attempts: {error}")
+
+class PokeAPIClient(_ClientSettings):
+    def __init__(self, base_url=None, timeout=None, retries=None, backoff=0.25, pool_size=None, breaker=None):
+        super().__init__(base_url, timeout, retries, backoff, breaker)
+        pool_size = pool_size or int(os.environ.get("POKEAPI_POOL_SIZE", 10))
+
+        self.session = requests.Session()
+        # pool_block keeps us at pool_size connections instead of opening throwaway extras
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/json"
+
+    def get_json(self, path):
+        """GET base_url/path -> parsed json, None on 404. Raises PokeAPIError once retries run out"""
+        url = self._url(path)
+        try:
+            result = self._get_json(url)
+        except BaseException:
+            # whatever went wrong - a half-open probe that never reports back would keep the breaker shut
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def _get_json(self, url):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self._delay(attempt - 1))
+            try:
+                resp = self.session.get(url, timeout=self.timeout)
+                return read_response(url, resp.status_code, resp.json)
+            except (requests.ConnectionError, requests.Timeout, RetryableError) as e:
+                error = e
+            except requests.RequestException as e:
+                # bad encoding, redirect loop, invalid url... another attempt won't help
+                raise PokeAPIError(f"{url} failed: {e}") from e
+        raise self._give_up(url, error) from error
+
+    def close(self):
+        self.session.close()
+
+class AsyncPokeAPIClient(_ClientSettings):
+    """Same as PokeAPIClient on httpx.AsyncClient, for the ASGI server - lots of lookups in flight, no thread each"""
+
+    def __init__(self, base_url=None, timeout=None, retries=None, backoff=0.25, pool_size=None, breaker=None):
+        if httpx is None:
+            raise ImportError("AsyncPokeAPIClient needs httpx (pip install httpx)")
+        super().__init__(base_url, timeout, retries, backoff, breaker)
+        pool_size = pool_size or int(os.environ.get("POKEAPI_ASYNC_POOL_SIZE", 100))
+        connect, read = self.timeout
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            headers={"Accept": "application/json"}
+        )
+
+    async def get_json(self, path):
+        url = self._url(path)
+        try:
+            result = await self._get_json(url)
+        except BaseException:  # cancellation too, same as the sync client
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _get_json(self, url):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._delay(attempt - 1))
+            try:
+                resp = await self.client.get(url)
+                return read_response(url, resp.status_code, resp.json)
+            except (httpx.TransportError, RetryableError) as e:
+                error = e
+            except httpx.HTTPError as e:
+                raise PokeAPIError(f"{url} failed: {e}") from e
+        raise self._give_up(url, error) from error
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Local Pokedex snapshot store.
+
+Builds a SQLite file from PokeAPI JSON dumps (any directory tree of
+pokemon/{id} and pokemon-species/{id} responses, e.g. a checkout of
+PokeAPI/api-data) holding one ready-made get_pokemon record per Pokemon,
+indexed by name and id. PokemonResource reads it before going to the
+network. Readers open it read-only with memory-mapped I/O, so several
+server processes share the same pages instead of each holding a copy.
+
+    python pokedex_store.py ingest path/to/dumps [--db pokedex.sqlite]
+    python pokedex_store.py lookup pikachu [--db pokedex.sqlite]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+DEFAULT_DB_PATH = str(Path(__file__).resolve().parent / "pokedex.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pokemon (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+)
+"""
+
+class PokedexStore:
+    def __init__(self, path=DEFAULT_DB_PATH, mmap_size=256 * 1024 * 1024):
+        self.path = str(path)
+        self.mmap_size = mmap_size
+        self._local = threading.local()  # sqlite connections can't be shared across threads
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """get_pokemon record by name or id, None if it isn't in the snapshot"""
+        key = str(key).strip().lower()
+        try:
+            if key.isdigit():
+                row = self._conn().execute("SELECT data FROM pokemon WHERE id = ?", (int(key),)).fetchone()
+            else:
+                row = self._conn().execute("SELECT data FROM pokemon WHERE name = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None  # missing/corrupt file - just act like a miss
+        return json.loads(row[0]) if row else None
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM pokemon").fetchone()[0]
+
+def _load_dumps(dump_dir):
+    # sort every json file into pokemon and pokemon-species responses by shape
+    pokemon, species = {}, {}
+    for path in Path(dump_dir).rglob("*.json"):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"skipping unreadable file {path}", file=sys.stderr)
+            continue
+        if not isinstance(data, dict) or "id" not in data:
+            continue
+        if "stats" in data and "types" in data:
+            pokemon[data["id"]] = data
+        elif "evolution_chain" in data:
+            species[data["id"]] = data
+    return pokemon, species
+
+def _species_id(poke):
+    # ".../pokemon-species/25/" -> 25, falls back to the pokemon id
+    url = (poke.get("species") or {}).get("url", "")
+    tail = url.rstrip("/").rsplit("/", 1)[-1]
+    return int(tail) if tail.isdigit() else poke["id"]
+
+def ingest(dump_dir, db_path=DEFAULT_DB_PATH):
+    """Build (or refresh) the store from a directory of PokeAPI JSON dumps -> records written"""
+    from pokemon_resource import build_record
+
+    pokemon, species = _load_dumps(dump_dir)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute(SCHEMA)
+        with conn:
+            for poke in pokemon.values():
+                record = build_record(poke, species.get(_species_id(poke)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO pokemon (id, name, data) VALUES (?, ?, ?)",
+                    (record["id"], record["name"].lower(), json.dumps(record, separators=(",", ":")))
+                )
+    finally:
+        conn.close()
+    return len(pokemon)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Pokedex snapshot store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = sub.add_parser("ingest", help="build the store from PokeAPI JSON dumps")
+    ingest_cmd.add_argument("dump_dir")
+    ingest_cmd.add_argument("--db", default=DEFAULT_DB_PATH)
+
+    lookup_cmd = sub.add_parser("lookup", help="print one record from the store")
+    lookup_cmd.add_argument("name")
+    lookup_cmd.add_argument("--db", default=DEFAULT_DB_PATH)
+
+    args = parser.parse_args()
+    if args.command == "ingest":
+        count = ingest(args.dump_dir, args.db)
+        print(f"Stored {count} Pokemon in {args.db}")
+        return 0
+
+    record = PokedexStore(args.db).get(args.name)
+    if not record:
+        print(f"{args.name} not found in {args.db}")
+        return 1
+    print(json.dumps(record, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
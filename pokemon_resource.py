@@ -1,41 +1,333 @@
-import requests
-from cachetools import TTLCache
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from cachetools import LRUCache, TTLCache
+from pokeapi_client import PokeAPIClient, PokeAPIError
+from pokedex_store import PokedexStore, DEFAULT_DB_PATH
+from tiered_cache import SingleFlight, TieredCache, open_disk_cache
 
-# pokeapi stuff
-API_URL = "https://pokeapi.co/api/v2"
-cache = TTLCache(maxsize=1000, ttl=3600)  # cache for 1 hour
+# fields that aren't part of the cached core record, only fetched when a caller asks for them.
+# sprites/moves are big, species (evolution chain ref) costs a second api call
+EXTRA_FIELDS = ("sprites", "moves", "species")
+HEAVY_FIELDS = ("sprites", "moves")
+
+class PokemonCore(namedtuple("PokemonCore", "id name types stats abilities")):
+    """What gets cached per pokemon - no sprites tree, full learnset or species"""
+    __slots__ = ()
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["id"], record["name"], tuple(record["types"]), record["stats"],
+                   tuple(record["abilities"]))
+
+    @classmethod
+    def decode(cls, value):
+        # json list from the disk cache (or a whole record / one with species cached by older versions)
+        if isinstance(value, dict):
+            return cls.from_record(value)
+        return cls(value[0], value[1], tuple(value[2]), value[3], tuple(value[4]))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "types": list(self.types),
+            "stats": dict(self.stats),
+            "abilities": list(self.abilities)
+        }
+
+# which fetch of a cached record a response was built from (see PokemonResource.version).
+# fresh_for is how long until it goes stale, stale_for how long it's served stale after that
+RecordVersion = namedtuple("RecordVersion", "fetched_at fresh_for stale_for")
+
+# memory LRU over an on-disk cache that survives restarts. entries are fresh for an hour,
+# then served stale (while refreshed in the background) for up to a day.
+# set POKEMON_CACHE_DB to "" to keep everything in memory only
+_cache_db = os.environ.get("POKEMON_CACHE_DB", str(Path(__file__).resolve().parent / "pokemon_cache.sqlite"))
+cache = TieredCache(
+    maxsize=int(os.environ.get("POKEMON_CACHE_SIZE", 1000)),
+    ttl=float(os.environ.get("POKEMON_CACHE_TTL", 3600)),
+    stale_ttl=float(os.environ.get("POKEMON_CACHE_STALE_TTL", 86400)),
+    disk_path=_cache_db,
+    disk_maxsize=int(os.environ.get("POKEMON_CACHE_DISK_SIZE", 100000)),
+    decode=PokemonCore.decode
+)
+
+# sprites + move lists by pokemon id. much bigger per entry and rarely needed,
+# so a smaller memory tier (own table in the same disk file)
+extras_cache = TieredCache(
+    maxsize=int(os.environ.get("POKEMON_EXTRAS_CACHE_SIZE", 200)),
+    ttl=float(os.environ.get("POKEMON_CACHE_TTL", 3600)),
+    stale_ttl=float(os.environ.get("POKEMON_CACHE_STALE_TTL", 86400)),
+    disk_path=_cache_db,
+    disk_maxsize=int(os.environ.get("POKEMON_CACHE_DISK_SIZE", 100000)),
+    disk_table="extras"
+)
+
+# {"species": evolution chain ref} by pokemon id, only looked up when asked for
+species_cache = TieredCache(
+    maxsize=int(os.environ.get("POKEMON_CACHE_SIZE", 1000)),
+    ttl=float(os.environ.get("POKEMON_CACHE_TTL", 3600)),
+    stale_ttl=float(os.environ.get("POKEMON_CACHE_STALE_TTL", 86400)),
+    disk_path=_cache_db,
+    disk_maxsize=int(os.environ.get("POKEMON_CACHE_DISK_SIZE", 100000)),
+    disk_table="species"
+)
+
+# names PokeAPI said don't exist (404), so typos don't hit the network every time.
+# short ttl since new pokemon do get added
+not_found = TTLCache(
+    maxsize=int(os.environ.get("POKEMON_NEGATIVE_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("POKEMON_NEGATIVE_CACHE_TTL", 300))
+)
+not_found_lock = threading.Lock()  # cachetools caches aren't thread safe
+
+def normalize_name(name):
+    # " Mr. Mime " -> "mr-mime", "Farfetch'd" -> "farfetchd", "Nidoran♀" -> "nidoran-f", "025" -> "25"
+    key = str(name).strip().lower().replace("♀", "-f").replace("♂", "-m")
+    key = re.sub(r"['.:]", "", key)
+    key = re.sub(r"[\s_-]+", "-", key).strip("-")
+    return str(int(key)) if key.isdigit() else key
+
+class KeyIndex:
+    """Every spelling/alias we've resolved -> pokemon id, so they all share the one cache entry keyed by id"""
+
+    def __init__(self, aliases=None, disk_path=None, maxsize=10000):
+        self.aliases = {normalize_name(k): normalize_name(v) for k, v in (aliases or {}).items()}
+        self.keys = LRUCache(maxsize=maxsize)
+        self.disk = open_disk_cache(disk_path, table="keys")  # survives restarts too
+        self._lock = threading.Lock()
+
+    def canonical(self, name):
+        # normalized spelling with aliases applied - what we'd ask PokeAPI for
+        key = normalize_name(name)
+        return self.aliases.get(key, key)
+
+    def resolve(self, key):
+        """Pokemon id (as a string) for a canonical key, None if we haven't seen it yet"""
+        if key.isdigit():
+            return key
+        with self._lock:
+            pokemon_id = self.keys.get(key)
+        if pokemon_id is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                pokemon_id = entry[0]
+                with self._lock:
+                    self.keys[key] = pokemon_id
+        return pokemon_id
+
+    def add(self, core, *spellings):
+        pokemon_id = str(core.id)
+        for key in {normalize_name(core.name), *spellings}:
+            if key.isdigit():
+                continue
+            with self._lock:
+                known = self.keys.get(key) == pokemon_id
+                self.keys[key] = pokemon_id
+            if self.disk is not None and not known:
+                self.disk.set(key, pokemon_id, time.time())
+
+def _load_aliases(path):
+    # json file of {"alias": "pokeapi name"}, e.g. {"sparky": "pikachu"}
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+# name/alias -> id index. POKEMON_ALIASES points at an optional alias file
+key_index = KeyIndex(
+    aliases=_load_aliases(os.environ.get("POKEMON_ALIASES")),
+    disk_path=_cache_db,
+    maxsize=int(os.environ.get("POKEMON_KEY_INDEX_SIZE", 10000))
+)
+first_lookups = SingleFlight()  # lookups by a spelling the index doesn't know yet
+
+def heavy_fields(record):
+    return {field: record.get(field) for field in HEAVY_FIELDS}
+
+def build_record(poke, species_data):
+    # make a simple object with what we need from the raw api responses
+    return {
+        "id": poke["id"],
+        "name": poke["name"],
+        "types": [t["type"]["name"] for t in poke["types"]],
+        "stats": {s["stat"]["name"]: s["base_stat"] for s in poke["stats"]},
+        "abilities": [a["ability"]["name"] for a in poke["abilities"]],
+        "moves": [m["move"]["name"] for m in poke["moves"]], # all the moves
+        "sprites": poke["sprites"],
+        "species": species_data and species_data.get("evolution_chain")
+    }
 
 class PokemonResource:
-    def _get_data(self, url):
-        # simple fetch function
+    def __init__(self, store=None, client=None):
+        # local pokedex snapshot (see pokedex_store.py) is checked before the network.
+        # POKEDEX_DB points at it, otherwise pokedex.sqlite next to this file if it exists
+        if store is None:
+            path = os.environ.get("POKEDEX_DB", DEFAULT_DB_PATH)
+            store = PokedexStore(path) if os.path.exists(path) else None
+        self.store = store
+        # pooled keep-alive session with timeouts + retries, POKEAPI_URL overrides the base url
+        self.client = client or PokeAPIClient()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def get_pokemon(self, name, include=()):
+        """Core record for name or id (None if not found), plus any of EXTRA_FIELDS listed in include.
+        Raises PokeAPIError if upstream is down (or the circuit is open) and nothing is cached"""
+        key = key_index.canonical(name)
+        with not_found_lock:
+            if key in not_found:
+                return None
+
+        # cache entries are keyed by id. memory/disk cache first, _load only runs on a miss
+        # (or in the background when stale). concurrent misses for the same key share one _load
         try:
-            resp = requests.get(f"{API_URL}/{url}")
-            return resp.json() if resp.status_code == 200 else None
-        except:
-            return None  # if api is down or something
-
-    def get_pokemon(self, name):
-        key = str(name).lower()
-        # check cache first
-        if key in cache:
-            return cache[key]
-
-        # get pokemon data
-        poke = self._get_data(f"pokemon/{key}")
-        if not poke:
+            pokemon_id = key_index.resolve(key)
+            if pokemon_id is not None:
+                core = cache.get(pokemon_id, lambda: self._load(pokemon_id))
+                if core is not None and key.isdigit():
+                    key_index.add(core)  # so the name finds this entry too
+            else:
+                # spelling we haven't resolved before - fetch by it, then file it under the id
+                core = first_lookups.do(key, lambda: self._load(key))
+                if core is not None:
+                    cache.set(str(core.id), core)
+                    key_index.add(core, key)
+        except PokeAPIError as e:
+            # upstream down (or circuit open) and nothing cached, not even stale. raised rather
+            # than None so callers can tell an outage from a typo
+            print(f"PokeAPI lookup failed: {e}", file=sys.stderr)
+            raise
+
+        if core is None:
+            with not_found_lock:
+                not_found[key] = True
+            return None
+
+        record = core.to_dict()
+        heavy = [field for field in include if field in HEAVY_FIELDS]
+        if heavy:
+            extras = self._get_lazy(extras_cache, core.id, self._load_extras)
+            if extras is not None:
+                record.update((field, extras[field]) for field in heavy)
+        if "species" in include:
+            species = self._get_lazy(species_cache, core.id, self._load_species)
+            if species is not None:
+                record["species"] = species["species"]
+        return record
+
+    def version(self, name, include=()):
+        """RecordVersion of what get_pokemon(name, include) would return from cache right now,
+        None if any part of it isn't cached or is past its stale window. Never loads anything"""
+        pokemon_id = key_index.resolve(key_index.canonical(name))
+        if pokemon_id is None:
+            return None
+        parts = [cache]
+        if any(field in HEAVY_FIELDS for field in include):
+            parts.append(extras_cache)
+        if "species" in include:
+            parts.append(species_cache)
+        stamps = [part.fetched_at(pokemon_id) for part in parts]
+        if None in stamps:
             return None
+        # the record changes when any part is refetched, and needs refreshing once the oldest is stale
+        fresh_for = min(stamps) + cache.ttl - time.time()
+        if fresh_for + cache.stale_ttl <= 0:
+            return None  # get_pokemon would refetch it, not serve it
+        return RecordVersion(max(stamps), max(0.0, fresh_for), min(cache.stale_ttl, fresh_for + cache.stale_ttl))
 
-        species_data = self._get_data(f"pokemon-species/{poke['id']}")
-        # make a simple object with what we need
-        result = {
-            "id": poke["id"],
-            "name": poke["name"],
-            "types": [t["type"]["name"] for t in poke["types"]],
-            "stats": {s["stat"]["name"]: s["base_stat"] for s in poke["stats"]},
-            "abilities": [a["ability"]["name"] for a in poke["abilities"]],
-            "moves": [m["move"]["name"] for m in poke["moves"]], # all the moves
-            "sprites": poke["sprites"],
-            "species": species_data and species_data.get("evolution_chain")
+    def _get_lazy(self, lazy_cache, pokemon_id, loader):
+        # deferred fields fail soft - the core record is still worth returning
+        try:
+            return lazy_cache.get(str(pokemon_id), lambda: loader(pokemon_id))
+        except PokeAPIError as e:
+            print(f"PokeAPI lookup failed: {e}", file=sys.stderr)
+            return None
+
+    def stats(self):
+        """Cache counters for the server's stats endpoint"""
+        with not_found_lock:
+            negative_entries = len(not_found)
+        return {
+            "memory_entries": len(cache.memory),
+            "extras_memory_entries": len(extras_cache.memory),
+            "species_memory_entries": len(species_cache.memory),
+            "negative_entries": negative_entries,
+            "coalesced_fetches": cache.coalesced + first_lookups.saved,
+            "upstream_circuit": self.client.breaker.state
         }
-        cache[key] = result
-        return result
+
+    def get_pokemon_many(self, names, include=(), return_errors=False):
+        """get_pokemon for every name, fetched concurrently -> results in the same order (None if not found).
+        Raises PokeAPIError like get_pokemon, or with return_errors puts it in that name's slot instead"""
+        keys = [key_index.canonical(name) for name in names]
+        unique = list(dict.fromkeys(keys))
+        fetch = partial(self.get_pokemon, include=include)
+        if return_errors:
+            fetch = partial(self._get_or_error, fetch)
+        if len(unique) <= 1:
+            results = {key: fetch(key) for key in unique}
+        else:
+            results = dict(zip(unique, self._executor().map(fetch, unique)))
+        return [results[key] for key in keys]
+
+    @staticmethod
+    def _get_or_error(fetch, key):
+        try:
+            return fetch(key)
+        except PokeAPIError as e:
+            return e
+
+    def _executor(self):
+        # bounded pool shared by every get_pokemon_many call, made on first use
+        with self._pool_lock:
+            if self._pool is None:
+                workers = int(os.environ.get("POKEMON_FETCH_WORKERS", 8))
+                self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pokemon-fetch")
+            return self._pool
+
+    def _load(self, key):
+        # local snapshot first
+        if self.store is not None:
+            result = self.store.get(key)
+            if result:
+                return PokemonCore.from_record(result)
+
+        # get pokemon data - upstream errors propagate so they're never cached as "not found".
+        # species is a separate call, only made if someone asks for it (_load_species)
+        poke = self.client.get_json(f"pokemon/{key}")
+        if not poke:
+            return None
+        record = build_record(poke, None)
+        # sprites/moves came with this response, keep them so include=sprites doesn't refetch it
+        extras_cache.set(str(poke["id"]), heavy_fields(record))
+        return PokemonCore.from_record(record)
+
+    def _load_extras(self, pokemon_id):
+        if self.store is not None:
+            result = self.store.get(pokemon_id)
+            if result:
+                return heavy_fields(result)
+
+        poke = self.client.get_json(f"pokemon/{pokemon_id}")
+        if not poke:
+            return None
+        return heavy_fields(build_record(poke, None))
+
+    def _load_species(self, pokemon_id):
+        if self.store is not None:
+            result = self.store.get(pokemon_id)
+            if result:
+                return {"species": result.get("species")}
+
+        # wrapped so a pokemon with no species entry (404) is cached too
+        species_data = self.client.get_json(f"pokemon-species/{pokemon_id}")
+        return {"species": species_data and species_data.get("evolution_chain")}
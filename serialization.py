@@ -0,0 +1,87 @@
+"""
+Response serialization for server.py.
+
+Payloads are encoded once with orjson when it's installed (stdlib json
+otherwise), compact unless the caller opts into pretty-printing with
+?pretty=1. Clients that send `Accept: application/msgpack` get
+MessagePack instead of JSON when msgpack is installed.
+
+MCP tool/resource results still carry their payload as a JSON string in
+content[].text / contents[].text, as the protocol expects - that string
+is compact too.
+"""
+
+import json
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+def _json_default(obj):
+    # numpy scalars/arrays from the simulator and solver
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(data, pretty=False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_json_default, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, default=_json_default).encode()
+    return json.dumps(data, separators=(",", ":"), default=_json_default).encode()
+
+def dumps_text(data, pretty=None) -> str:
+    """JSON string for MCP text content (pretty only when the request asked for it)"""
+    return dumps(data, wants_pretty() if pretty is None else pretty).decode()
+
+def wants_pretty() -> bool:
+    return request.args.get("pretty", "").lower() in ("1", "true", "yes")
+
+def _wants_msgpack() -> bool:
+    if msgpack is None:
+        return False
+    accept = request.accept_mimetypes
+    best = accept.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+    return best in MSGPACK_MIMETYPES
+
+def representation() -> tuple:
+    """(mimetype, pretty) the current request wants - everything the encoded bytes depend on besides the data"""
+    return (MSGPACK_MIMETYPES[0] if _wants_msgpack() else JSON_MIMETYPE), wants_pretty()
+
+def encode(data, rep) -> bytes:
+    mimetype, pretty = rep
+    if mimetype != JSON_MIMETYPE:
+        return msgpack.packb(data, default=_json_default)
+    return dumps(data, pretty)
+
+def respond(data, status=200) -> Response:
+    """data as JSON or MessagePack, whichever the Accept header prefers"""
+    rep = representation()
+    response = Response(encode(data, rep), status=status, mimetype=rep[0])
+    response.vary.add("Accept")
+    return response
+
+def tool_content(data) -> dict:
+    """MCP tools/call result with data as its text content"""
+    return {"content": [{"type": "text", "text": dumps_text(data)}]}
+
+def resource_contents(uri, data) -> dict:
+    """MCP resources/read result with data as its text content"""
+    return {"contents": [{"uri": uri, "mimeType": JSON_MIMETYPE, "text": dumps_text(data)}]}
+
+def tool_result(data, status=200) -> Response:
+    return respond(tool_content(data), status)
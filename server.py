@@ -1,10 +1,18 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS
-from pokemon_resource import PokemonResource
-from battle_simulator import BattleSimulator
+from pokemon_resource import PokemonResource, EXTRA_FIELDS, key_index
+from pokeapi_client import CircuitOpenError, PokeAPIError
+from battle_simulator import (BattleSimulator, BattlerState, LOG_LEVELS, TYPE_MATRIX, NEUTRAL_TYPE,
+                              damage_preview, get_type_id, np)
+from battle_solver import SolverBudgetExceeded, sample_battle, solve_battle
+from battle_batch import run_batch
+from warmup import WarmUp, warmup_names
+from serialization import dumps, resource_contents, respond, tool_content, tool_result
+from http_cache import cached_response, response_cache
 from datetime import datetime
-import json
+import os
 from typing import Dict
+from urllib.parse import parse_qs
 
 app = Flask(__name__)
 CORS(app)  # cors for frontend
@@ -12,13 +20,39 @@ CORS(app)  # cors for frontend
 # initialize the pokemon stuff
 pokemon_api = PokemonResource()
 battle_sim = BattleSimulator()
+warmup = None  # set by start_warmup()
+
+# simulate_batch limits per request
+MAX_BATCH_MATCHUPS = 100
+MAX_BATCH_BATTLES = 10000
+MAX_BATCH_FULL_LOG_BATTLES = 100  # a full turn log per battle adds up fast
+
+# compare_pokemon solves the odds exactly up to this many hp states (~0.5s), samples them past it
+COMPARE_SOLVER_STATES = int(os.environ.get("COMPARE_SOLVER_STATES", 1500000))
+
+def start_warmup(names=None):
+    """Start loading popular species into the cache in the background (POKEMON_WARMUP picks the list)"""
+    global warmup
+    if warmup is None:
+        names = warmup_names() if names is None else names
+        workers = int(os.environ.get("POKEMON_WARMUP_WORKERS", 4))
+        warmup = WarmUp(pokemon_api, names, workers).start()
+    return warmup
 
 # MCP Protocol Implementation
 
+@app.errorhandler(PokeAPIError)
+def upstream_unavailable(e):
+    # PokeAPI down and the pokemon isn't cached - not the same thing as a name that doesn't exist
+    response = respond({"error": "Pokemon data is temporarily unavailable, try again shortly"}, 503)
+    if isinstance(e, CircuitOpenError):
+        response.headers["Retry-After"] = str(int(pokemon_api.client.breaker.reset_timeout))
+    return response
+
 @app.route("/mcp/info", methods=["GET"])
 def get_server_info():
     # basic server info for mcp
-    return jsonify({
+    return respond({
         "name": "Pokemon Battle MCP Server",
         "version": "1.0.0", 
         "description": "Pokemon battle simulation with MCP",
@@ -33,10 +67,27 @@ def get_server_info():
         }
     })
 
+@app.route("/mcp/stats", methods=["GET"])
+def get_server_stats():
+    # runtime counters (cache, coalesced upstream fetches)
+    return respond({
+        "pokemon_cache": pokemon_api.stats(),
+        "response_cache": response_cache.stats(),
+        "warmup": warmup.status() if warmup else None
+    })
+
+@app.route("/ready", methods=["GET"])
+def readiness():
+    # 503 until the cache warm-up finishes, so a load balancer can hold traffic
+    if warmup is None:
+        return respond({"ready": True, "state": "skipped"})
+    status = warmup.status()
+    return respond(status), 200 if status["ready"] else 503
+
 @app.route("/mcp/resources/list", methods=["GET"])
 def list_resources():
     """List all available resources"""
-    return jsonify({
+    return respond({
         "resources": [
             {
                 "uri": "pokemon://data/{name}",
@@ -61,56 +112,53 @@ def read_resource():
     print(f"Reading resource: {uri}")  # debug
     
     if uri.startswith("pokemon://data/"):
-        pokemon_name = uri.replace("pokemon://data/", "")
-        pokemon_data = pokemon_api.get_pokemon(pokemon_name)
-        if not pokemon_data:
-            return jsonify({"error": f"Pokemon '{pokemon_name}' not found"}), 404
-        
-        return jsonify({
-            "contents": [
-                {
-                    "uri": uri,
-                    "mimeType": "application/json",
-                    "text": json.dumps(pokemon_data, indent=2)
-                }
-            ]
-        })
+        # pokemon://data/{name}?include=sprites,moves
+        pokemon_name, _, query = uri.replace("pokemon://data/", "").partition("?")
+        try:
+            include = parse_include(parse_qs(query).get("include", [None])[0])
+        except ValueError as e:
+            return respond({"error": str(e)}), 400
+
+        def build():
+            pokemon_data = pokemon_api.get_pokemon(pokemon_name, include)
+            if not pokemon_data:
+                return respond({"error": f"Pokemon '{pokemon_name}' not found"}), 404
+            return resource_contents(uri, pokemon_data)
+
+        # the uri is echoed in the payload, so it's the cache key as is
+        return cached_response(("resource", uri), lambda: [pokemon_api.version(pokemon_name, include)], build)
     
     elif uri.startswith("pokemon://battle/"):
         parts = uri.replace("pokemon://battle/", "").split("/")
         if len(parts) != 2:
-            return jsonify({"error": "Invalid battle URI format"}), 400
+            return respond({"error": "Invalid battle URI format"}), 400
         
         pokemon1, pokemon2 = parts
-        p1_data = pokemon_api.get_pokemon(pokemon1)
-        p2_data = pokemon_api.get_pokemon(pokemon2)
-        
-        if not p1_data or not p2_data:
-            return jsonify({"error": "One or both Pokemon not found"}), 404
-        
-        battle_preview = {
-            "matchup": f"{pokemon1.title()} vs {pokemon2.title()}",
-            "pokemon1": p1_data,
-            "pokemon2": p2_data,
-            "type_advantages": analyze_type_advantages(p1_data, p2_data)
-        }
-        
-        return jsonify({
-            "contents": [
-                {
-                    "uri": uri,
-                    "mimeType": "application/json",
-                    "text": json.dumps(battle_preview, indent=2)
-                }
-            ]
-        })
+
+        def build():
+            p1_data, p2_data = pokemon_api.get_pokemon_many([pokemon1, pokemon2])
+
+            if not p1_data or not p2_data:
+                return respond({"error": "One or both Pokemon not found"}), 404
+
+            battle_preview = {
+                "matchup": f"{pokemon1.title()} vs {pokemon2.title()}",
+                "pokemon1": p1_data,
+                "pokemon2": p2_data,
+                "type_advantages": analyze_type_advantages(p1_data, p2_data),
+                "damage_preview": damage_previews(p1_data, p2_data)
+            }
+            return resource_contents(uri, battle_preview)
+
+        return cached_response(("resource", uri), lambda: [pokemon_api.version(pokemon1), pokemon_api.version(pokemon2)],
+                               build)
     
-    return jsonify({"error": "Resource not found"}), 404
+    return respond({"error": "Resource not found"}), 404
 
 @app.route("/mcp/tools/list", methods=["GET"])
 def list_tools():
     """List all available tools"""
-    return jsonify({
+    return respond({
         "tools": [
             {
                 "name": "simulate_battle",
@@ -133,18 +181,76 @@ def list_tools():
                                 "level": {"type": "integer", "default": 50, "minimum": 1, "maximum": 100}
                             },
                             "required": ["name"]
-                        }
+                        },
+                        "log_level": {
+                            "type": "string",
+                            "enum": list(LOG_LEVELS),
+                            "default": "full",
+                            "description": "none = winner/turns/final hp, summary = plus counters, full = plus turn log"
+                        },
+                        "seed": {"type": "integer", "description": "Root seed, to replay a previous result"},
+                        "battle_index": {"type": "integer", "minimum": 0, "description": "Sub-stream of the seed to replay"}
                     },
                     "required": ["pokemon1", "pokemon2"]
                 }
             },
+            {
+                "name": "simulate_batch",
+                "description": "Run many matchups (each repeated N times) in one call and return win counts per matchup",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "matchups": {
+                            "type": "array",
+                            "maxItems": MAX_BATCH_MATCHUPS,
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "pokemon1": {
+                                        "type": "object",
+                                        "properties": {
+                                            "name": {"type": "string"},
+                                            "level": {"type": "integer", "default": 50, "minimum": 1, "maximum": 100}
+                                        },
+                                        "required": ["name"]
+                                    },
+                                    "pokemon2": {
+                                        "type": "object",
+                                        "properties": {
+                                            "name": {"type": "string"},
+                                            "level": {"type": "integer", "default": 50, "minimum": 1, "maximum": 100}
+                                        },
+                                        "required": ["name"]
+                                    },
+                                    "repeat": {"type": "integer", "default": 1, "minimum": 1, "maximum": MAX_BATCH_BATTLES}
+                                },
+                                "required": ["pokemon1", "pokemon2"]
+                            }
+                        },
+                        "log_level": {
+                            "type": "string",
+                            "enum": list(LOG_LEVELS),
+                            "default": "none",
+                            "description": "none = win counts only, summary/full = plus every battle's result "
+                                           f"(full: at most {MAX_BATCH_FULL_LOG_BATTLES} battles)"
+                        },
+                        "seed": {"type": "integer", "description": "Root seed, to reproduce a previous batch"}
+                    },
+                    "required": ["matchups"]
+                }
+            },
             {
                 "name": "get_pokemon",
                 "description": "Get detailed information about a specific Pokemon",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
-                        "name": {"type": "string", "description": "Name of the Pokemon"}
+                        "name": {"type": "string", "description": "Name of the Pokemon"},
+                        "include": {
+                            "type": "array",
+                            "items": {"type": "string", "enum": list(EXTRA_FIELDS)},
+                            "description": "Optional fields to add to the core record: sprites, moves, species (evolution chain). Default: sprites"
+                        }
                     },
                     "required": ["name"]
                 }
@@ -176,17 +282,24 @@ def call_tool():
         p2 = arguments.get("pokemon2")
         
         if not p1 or not p2:
-            return jsonify({"error": "Both pokemon1 and pokemon2 are required"}), 400
+            return respond({"error": "Both pokemon1 and pokemon2 are required"}), 400
         
-        # Fetch full pokemon data
-        full1 = pokemon_api.get_pokemon(p1["name"])
-        full2 = pokemon_api.get_pokemon(p2["name"])
+        # Fetch full pokemon data (both at once)
+        full1, full2 = pokemon_api.get_pokemon_many([p1["name"], p2["name"]])
         
         if not full1 or not full2:
-            return jsonify({"error": "One or both Pokemon not found"}), 404
+            return respond({"error": "One or both Pokemon not found"}), 404
         
-        # Simulate battle
-        battle_result = battle_sim.simulate(full1, full2, p1.get("level", 50), p2.get("level", 50))
+        log_level = arguments.get("log_level", "full")
+        if log_level not in LOG_LEVELS:
+            return respond({"error": f"log_level must be one of {', '.join(LOG_LEVELS)}"}), 400
+        
+        # Simulate battle - passing back a result's seed/battle_index replays it exactly
+        sim = battle_sim if arguments.get("seed") is None else BattleSimulator(seed=arguments["seed"])
+        battle_result = sim.simulate(
+            full1, full2, p1.get("level", 50), p2.get("level", 50),
+            log_level, arguments.get("battle_index")
+        )
         
         # Enhanced battle result with summary
         enhanced_result = {
@@ -199,76 +312,130 @@ def call_tool():
             "timestamp": datetime.now().isoformat()
         }
         
-        return jsonify({
-            "content": [
-                {
-                    "type": "text",
-                    "text": json.dumps(enhanced_result, indent=2)
-                }
-            ]
+        return tool_result(enhanced_result)
+    
+    elif tool_name == "simulate_batch":
+        matchups = arguments.get("matchups")
+        if not isinstance(matchups, list) or not matchups:
+            return respond({"error": "matchups must be a non-empty list"}), 400
+        if len(matchups) > MAX_BATCH_MATCHUPS:
+            return respond({"error": f"at most {MAX_BATCH_MATCHUPS} matchups per batch"}), 400
+        
+        log_level = arguments.get("log_level", "none")
+        if log_level not in LOG_LEVELS:
+            return respond({"error": f"log_level must be one of {', '.join(LOG_LEVELS)}"}), 400
+        
+        # bad matchups get an error in their slot, the rest still run
+        results = [parse_batch_matchup(m) for m in matchups]
+        total = sum(r["repeat"] for r in results if "error" not in r)
+        if total > MAX_BATCH_BATTLES:
+            return respond({"error": f"at most {MAX_BATCH_BATTLES} battles per batch (got {total})"}), 400
+        if log_level == "full" and total > MAX_BATCH_FULL_LOG_BATTLES:
+            return respond({
+                "error": f"log_level full is limited to {MAX_BATCH_FULL_LOG_BATTLES} battles per batch "
+                         f"(got {total}), use summary or replay single battles through simulate_battle"
+            }), 400
+        
+        # every distinct species looked up once; an upstream failure only fails the matchups that need it
+        names = [r[side] for r in results if "error" not in r for side in ("pokemon1", "pokemon2")]
+        found = dict(zip(names, pokemon_api.get_pokemon_many(names, return_errors=True)))
+        runnable = []
+        for r in results:
+            if "error" in r:
+                continue
+            if any(isinstance(found[r[side]], PokeAPIError) for side in ("pokemon1", "pokemon2")):
+                r["error"] = "Pokemon data temporarily unavailable"
+                continue
+            missing = [r[side] for side in ("pokemon1", "pokemon2") if not found[r[side]]]
+            if missing:
+                r["error"] = f"Pokemon not found: {', '.join(missing)}"
+                continue
+            r["pokemon1"], r["pokemon2"] = found[r["pokemon1"]], found[r["pokemon2"]]
+            runnable.append(r)
+        
+        batch = run_batch(runnable, arguments.get("seed"), log_level) if runnable else {
+            "seed": arguments.get("seed"), "matchups": []
+        }
+        summaries = iter(batch["matchups"])
+        items = []
+        for index, r in enumerate(results):
+            item = {"index": index, "error": r["error"]} if "error" in r else {"index": index, **next(summaries)}
+            items.append(item)
+        
+        return tool_result({
+            "seed": batch["seed"],
+            "battles": sum(r["repeat"] for r in runnable),  # what actually ran
+            "errors": sum(1 for item in items if "error" in item),
+            "results": items
         })
     
     elif tool_name == "get_pokemon":
         pokemon_name = arguments.get("name")
         if not pokemon_name:
-            return jsonify({"error": "Pokemon name is required"}), 400
+            return respond({"error": "Pokemon name is required"}), 400
         
-        pokemon_data = pokemon_api.get_pokemon(pokemon_name)
-        if not pokemon_data:
-            return jsonify({"error": f"Pokemon '{pokemon_name}' not found"}), 404
+        try:
+            include = parse_include(arguments.get("include"))
+        except ValueError as e:
+            return respond({"error": str(e)}), 400
         
-        return jsonify({
-            "content": [
-                {
-                    "type": "text",
-                    "text": json.dumps(pokemon_data, indent=2)
-                }
-            ]
-        })
+        def build():
+            pokemon_data = pokemon_api.get_pokemon(pokemon_name, include)
+            if not pokemon_data:
+                return respond({"error": f"Pokemon '{pokemon_name}' not found"}), 404
+            return tool_content(pokemon_data)
+
+        return cached_response(("get_pokemon", key_index.canonical(pokemon_name), include),
+                               lambda: [pokemon_api.version(pokemon_name, include)], build)
     
     elif tool_name == "compare_pokemon":
         pokemon1 = arguments.get("pokemon1")
         pokemon2 = arguments.get("pokemon2")
         
         if not pokemon1 or not pokemon2:
-            return jsonify({"error": "Both pokemon1 and pokemon2 names are required"}), 400
-        
-        p1_data = pokemon_api.get_pokemon(pokemon1)
-        p2_data = pokemon_api.get_pokemon(pokemon2)
-        
-        if not p1_data or not p2_data:
-            return jsonify({"error": "One or both Pokemon not found"}), 404
-        
-        comparison = {
-            "pokemon1": {
-                "name": p1_data["name"],
-                "types": p1_data["types"],
-                "stats": p1_data["stats"]
-            },
-            "pokemon2": {
-                "name": p2_data["name"],
-                "types": p2_data["types"],
-                "stats": p2_data["stats"]
-            },
-            "stat_comparison": compare_stats(p1_data["stats"], p2_data["stats"]),
-            "type_advantages": analyze_type_advantages(p1_data, p2_data)
-        }
+            return respond({"error": "Both pokemon1 and pokemon2 names are required"}), 400
         
-        return jsonify({
-            "content": [
-                {
-                    "type": "text",
-                    "text": json.dumps(comparison, indent=2)
-                }
-            ]
-        })
+        def build():
+            p1_data, p2_data = pokemon_api.get_pokemon_many([pokemon1, pokemon2])
+
+            if not p1_data or not p2_data:
+                return respond({"error": "One or both Pokemon not found"}), 404
+
+            comparison = {
+                "pokemon1": {
+                    "name": p1_data["name"],
+                    "types": p1_data["types"],
+                    "stats": p1_data["stats"]
+                },
+                "pokemon2": {
+                    "name": p2_data["name"],
+                    "types": p2_data["types"],
+                    "stats": p2_data["stats"]
+                },
+                "stat_comparison": compare_stats(p1_data["stats"], p2_data["stats"]),
+                "type_advantages": analyze_type_advantages(p1_data, p2_data)
+            }
+
+            # exact level 50 odds from the markov chain solver (needs numpy)
+            if np is not None:
+                try:
+                    comparison["win_probability"] = solve_battle(p1_data, p2_data, max_states=COMPARE_SOLVER_STATES)
+                except SolverBudgetExceeded:
+                    # long high-hp battle, too slow to solve in a request
+                    comparison["win_probability"] = sample_battle(p1_data, p2_data)
+
+            return tool_content(comparison)
+
+        # names only show up in the payload as their canonical form
+        return cached_response(("compare_pokemon", key_index.canonical(pokemon1), key_index.canonical(pokemon2)),
+                               lambda: [pokemon_api.version(pokemon1), pokemon_api.version(pokemon2)], build)
     
-    return jsonify({"error": f"Unknown tool: {tool_name}"}), 400
+    return respond({"error": f"Unknown tool: {tool_name}"}), 400
 
 @app.route("/mcp/prompts/list", methods=["GET"])
 def list_prompts():
     """List available prompt templates"""
-    return jsonify({
+    return respond({
         "prompts": [
             {
                 "name": "battle_narrator",
@@ -336,18 +503,78 @@ Provide accurate, detailed information about Pokemon including their stats, type
     }
     
     if prompt_name in prompts:
-        return jsonify(prompts[prompt_name])
+        return respond(prompts[prompt_name])
+    
+    return respond({"error": f"Prompt '{prompt_name}' not found"}), 404
+
+@app.route("/mcp/tools/simulate_battle/stream", methods=["GET", "POST"])
+def simulate_battle_stream():
+    """simulate_battle as Server-Sent Events: one "turn" event per turn as it's played, then "result".
+    POST takes the tool's arguments, GET takes pokemon1, pokemon2, level1, level2, seed, battle_index"""
+    if request.method == "POST":
+        arguments = request.get_json(silent=True) or {}
+        p1, p2 = arguments.get("pokemon1"), arguments.get("pokemon2")
+        seed, battle_index = arguments.get("seed"), arguments.get("battle_index")
+    else:
+        # GET so a browser EventSource can use it
+        args = request.args
+        p1 = {"name": args["pokemon1"], "level": args.get("level1", 50, type=int)} if args.get("pokemon1") else None
+        p2 = {"name": args["pokemon2"], "level": args.get("level2", 50, type=int)} if args.get("pokemon2") else None
+        seed, battle_index = args.get("seed", type=int), args.get("battle_index", type=int)
+    
+    if not p1 or not p2:
+        return respond({"error": "Both pokemon1 and pokemon2 are required"}), 400
+    
+    full1, full2 = pokemon_api.get_pokemon_many([p1["name"], p2["name"]])
+    if not full1 or not full2:
+        return respond({"error": "One or both Pokemon not found"}), 404
+    
+    lv1, lv2 = p1.get("level", 50), p2.get("level", 50)
+    sim = battle_sim if seed is None else BattleSimulator(seed=seed)
+    participants = {
+        "pokemon1": {"name": full1["name"], "types": full1["types"], "level": lv1},
+        "pokemon2": {"name": full2["name"], "types": full2["types"], "level": lv2}
+    }
+    
+    def events():
+        yield sse_event("start", {"participants": participants})
+        turns = sim.simulate_turns(full1, full2, lv1, lv2, "full", battle_index)
+        while True:
+            try:
+                entries = next(turns)
+            except StopIteration as done:
+                result = done.value
+                break
+            yield sse_event("turn", {"turn": entries[0]["turn"] if entries else None, "entries": entries})
+        yield sse_event("result", {
+            **result,
+            "summary": f"{result['winner']} wins after {result['turns']} turns!",
+            "participants": participants,
+            "timestamp": datetime.now().isoformat()
+        })
     
-    return jsonify({"error": f"Prompt '{prompt_name}' not found"}), 404
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # don't let a proxy sit on the events
+    })
 
 # Legacy endpoints for backward compatibility
 @app.route("/resources/pokemon/<name>", methods=["GET"])
 def get_pokemon_legacy(name):
     """Legacy endpoint for Pokemon data"""
-    data = pokemon_api.get_pokemon(name)
-    if not data:
-        return jsonify({"error": "not found"}), 404
-    return jsonify(data)
+    try:
+        include = parse_include(request.args.get("include"))
+    except ValueError as e:
+        return respond({"error": str(e)}), 400
+
+    def build():
+        data = pokemon_api.get_pokemon(name, include)
+        if not data:
+            return respond({"error": "not found"}), 404
+        return data
+
+    return cached_response(("legacy", key_index.canonical(name), include),
+                           lambda: [pokemon_api.version(name, include)], build)
 
 @app.route("/tools/simulate_battle", methods=["POST"])
 def simulate_battle_legacy():
@@ -357,48 +584,95 @@ def simulate_battle_legacy():
     p2 = payload.get("pokemon2")
     
     if not p1 or not p2:
-        return jsonify({"error": "pokemon1 and pokemon2 required"}), 400
+        return respond({"error": "pokemon1 and pokemon2 required"}), 400
 
-    full1 = pokemon_api.get_pokemon(p1["name"])
-    full2 = pokemon_api.get_pokemon(p2["name"])
+    full1, full2 = pokemon_api.get_pokemon_many([p1["name"], p2["name"]])
     
     if not full1 or not full2:
-        return jsonify({"error": "one or both pokemon not found"}), 404
+        return respond({"error": "one or both pokemon not found"}), 404
+
+    log_level = payload.get("log_level", "full")
+    if log_level not in LOG_LEVELS:
+        return respond({"error": f"log_level must be one of {', '.join(LOG_LEVELS)}"}), 400
 
-    log = battle_sim.simulate(full1, full2, p1.get("level", 50), p2.get("level", 50))
-    return jsonify(log)
+    log = battle_sim.simulate(full1, full2, p1.get("level", 50), p2.get("level", 50), log_level)
+    return respond(log)
 
 # Helper functions
+def sse_event(event: str, data) -> str:
+    """One Server-Sent Events frame"""
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+def parse_batch_matchup(matchup) -> Dict:
+    """One simulate_batch matchup -> {pokemon1, pokemon2 (names), level1, level2, repeat} or {error}"""
+    if not isinstance(matchup, dict):
+        return {"error": "matchup must be an object"}
+    parsed = {}
+    for side in ("pokemon1", "pokemon2"):
+        poke = matchup.get(side)
+        if isinstance(poke, str):
+            poke = {"name": poke}
+        if not isinstance(poke, dict) or not poke.get("name"):
+            return {"error": f"{side} with a name is required"}
+        level = poke.get("level", 50)
+        if not isinstance(level, int) or not 1 <= level <= 100:
+            return {"error": f"{side} level must be an integer from 1 to 100"}
+        parsed[side] = str(poke["name"])
+        parsed["level" + side[-1]] = level
+    repeat = matchup.get("repeat", 1)
+    if not isinstance(repeat, int) or not 1 <= repeat <= MAX_BATCH_BATTLES:
+        return {"error": f"repeat must be an integer from 1 to {MAX_BATCH_BATTLES}"}
+    parsed["repeat"] = repeat
+    return parsed
+
+def parse_include(value) -> tuple:
+    """include argument (list or comma separated string) -> tuple of EXTRA_FIELDS.
+    Defaults to sprites, which the frontend reads from pokemon payloads"""
+    if value is None:
+        return ("sprites",)
+    fields = value.split(",") if isinstance(value, str) else list(value)
+    fields = tuple(f.strip() for f in fields if f.strip())
+    unknown = [f for f in fields if f not in EXTRA_FIELDS]
+    if unknown:
+        raise ValueError(f"include must be from {', '.join(EXTRA_FIELDS)} (got {', '.join(unknown)})")
+    return fields
+
 def analyze_type_advantages(p1_data: Dict, p2_data: Dict) -> Dict:
     """Analyze type advantages between two Pokemon"""
-    from battle_simulator import TYPE_CHART
-    
-    p1_advantages = []
-    p2_advantages = []
-    
-    for p1_type in p1_data["types"]:
-        for p2_type in p2_data["types"]:
-            if p1_type in TYPE_CHART and p2_type in TYPE_CHART[p1_type]:
-                effectiveness = TYPE_CHART[p1_type][p2_type]
-                if effectiveness > 1:
-                    p1_advantages.append(f"{p1_type} is super effective against {p2_type}")
-                elif effectiveness < 1:
-                    p1_advantages.append(f"{p1_type} is not very effective against {p2_type}")
-    
-    for p2_type in p2_data["types"]:
-        for p1_type in p1_data["types"]:
-            if p2_type in TYPE_CHART and p1_type in TYPE_CHART[p2_type]:
-                effectiveness = TYPE_CHART[p2_type][p1_type]
-                if effectiveness > 1:
-                    p2_advantages.append(f"{p2_type} is super effective against {p1_type}")
-                elif effectiveness < 1:
-                    p2_advantages.append(f"{p2_type} is not very effective against {p1_type}")
+    p1_advantages = type_advantage_notes(p1_data["types"], p2_data["types"])
+    p2_advantages = type_advantage_notes(p2_data["types"], p1_data["types"])
     
     return {
         f"{p1_data['name']}_advantages": p1_advantages,
         f"{p2_data['name']}_advantages": p2_advantages
     }
 
+def type_advantage_notes(attack_types, defend_types):
+    """One line per attacking/defending type pair that isn't neutral"""
+    notes = []
+    for attack_type in attack_types:
+        attack_id = get_type_id(attack_type)
+        if attack_id == NEUTRAL_TYPE:
+            continue
+        for defend_type in defend_types:
+            defend_id = get_type_id(defend_type)
+            if defend_id == NEUTRAL_TYPE:
+                continue
+            effectiveness = TYPE_MATRIX[attack_id][defend_id]
+            if effectiveness > 1:
+                notes.append(f"{attack_type} is super effective against {defend_type}")
+            elif effectiveness < 1:
+                notes.append(f"{attack_type} is not very effective against {defend_type}")
+    return notes
+
+def damage_previews(p1_data: Dict, p2_data: Dict) -> Dict:
+    """Level 50 damage ranges for each side's moves, from the cached damage tables"""
+    state1, state2 = BattlerState(p1_data), BattlerState(p2_data)
+    return {
+        p1_data["name"]: damage_preview(state1, state2),
+        p2_data["name"]: damage_preview(state2, state1)
+    }
+
 def compare_stats(stats1: Dict, stats2: Dict) -> Dict:
     """Compare stats between two Pokemon"""
     comparison = {}
@@ -416,15 +690,18 @@ def compare_stats(stats1: Dict, stats2: Dict) -> Dict:
 @app.route("/")
 def index():
     """MCP Server status and information"""
-    return jsonify({
+    return respond({
         "name": "Pokemon Battle MCP Server",
         "version": "1.0.0",
         "status": "running",
         "mcp_endpoints": {
             "info": "/mcp/info",
+            "stats": "/mcp/stats",
+            "ready": "/ready",
             "resources": "/mcp/resources/list",
             "tools": "/mcp/tools/list",
-            "prompts": "/mcp/prompts/list"
+            "prompts": "/mcp/prompts/list",
+            "battle_stream": "/mcp/tools/simulate_battle/stream"
         },
         "legacy_endpoints": {
             "pokemon_data": "/resources/pokemon/<name>",
@@ -433,4 +710,7 @@ def index():
     })
 
 if __name__ == "__main__":
+    # with the debug reloader only the child process (WERKZEUG_RUN_MAIN) actually serves
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_warmup()
     app.run(host="0.0.0.0", port=8080, debug=True)
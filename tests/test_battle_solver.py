@@ -0,0 +1,54 @@
+"""solve_battle against simulate_many on the benchmark fixtures - no network needed"""
+
+import json
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from battle_simulator import BattleSimulator, np  # noqa: E402
+from battle_solver import SolverBudgetExceeded, sample_battle, solve_battle  # noqa: E402
+
+pytestmark = pytest.mark.skipif(np is None, reason="needs numpy")
+
+with open(ROOT / "benchmarks" / "fixtures" / "pokemon.json") as f:
+    POKEMON = json.load(f)
+
+BATTLES = 20000
+
+@pytest.mark.parametrize("name1,name2", [
+    ("pikachu", "charizard"),  # lopsided
+    ("gengar", "alakazam"),
+    ("machamp", "gyarados"),
+    ("snorlax", "snorlax"),  # mirror, speed tie every turn
+])
+def test_solver_matches_sampling(name1, name2):
+    p1, p2 = POKEMON[name1], POKEMON[name2]
+    exact = solve_battle(p1, p2)
+    sampled = BattleSimulator(seed=1234).simulate_many(p1, p2, BATTLES)
+
+    assert exact["dropped_mass"] < 1e-6
+    total = (exact["pokemon1"]["win_probability"] + exact["pokemon2"]["win_probability"]
+             + exact["draw_probability"])
+    assert total == pytest.approx(1.0, abs=1e-6)
+
+    for side in ("pokemon1", "pokemon2"):
+        p = exact[side]["win_probability"]
+        # 5 standard errors, plus a little slack for probabilities right at 0 or 1
+        margin = 5 * math.sqrt(p * (1 - p) / BATTLES) + 1e-3
+        assert sampled[side]["win_rate"] == pytest.approx(p, abs=margin)
+
+    turns_std = max(1.0, math.sqrt(sampled["turns"]["mean"]))
+    assert sampled["turns"]["mean"] == pytest.approx(exact["expected_turns"], abs=5 * turns_std / math.sqrt(BATTLES) + 0.05)
+
+def test_budget_raises_and_sampling_has_same_shape():
+    p1, p2 = POKEMON["snorlax"], POKEMON["snorlax"]
+    with pytest.raises(SolverBudgetExceeded):
+        solve_battle(p1, p2, max_states=1000)
+    estimate = sample_battle(p1, p2, battles=500)
+    assert set(estimate) >= {"pokemon1", "pokemon2", "draw_probability", "expected_turns"}
+    assert estimate == sample_battle(p1, p2, battles=500)  # fixed seed
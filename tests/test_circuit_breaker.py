@@ -0,0 +1,112 @@
+"""CircuitBreaker on its own and through PokeAPIClient.get_json - no network (the session is stubbed)"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pokeapi_client import CircuitBreaker, CircuitOpenError, PokeAPIClient, PokeAPIError  # noqa: E402
+
+RESET = 0.05
+
+def _open_breaker(threshold=3):
+    breaker = CircuitBreaker(threshold=threshold, reset_timeout=RESET)
+    for _ in range(threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_half_open_lets_exactly_one_probe_through():
+    breaker = _open_breaker()
+    time.sleep(RESET * 1.5)
+    assert breaker.state == "half-open"
+
+    allowed = []
+    threads = [threading.Thread(target=lambda: allowed.append(breaker.allow())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert allowed.count(True) == 1
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_failed_probe_reopens():
+    breaker = _open_breaker()
+    time.sleep(RESET * 1.5)
+    assert breaker.allow()  # the probe
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    # and the wait starts over before the next probe
+    time.sleep(RESET * 1.5)
+    assert breaker.allow()
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+def _client(responses):
+    client = PokeAPIClient(base_url="http://pokeapi.test", retries=0, backoff=0,
+                           breaker=CircuitBreaker(threshold=2, reset_timeout=RESET))
+
+    def get(url, timeout=None):
+        outcome = responses.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    client.session.get = get
+    return client
+
+def test_client_fails_fast_while_open_and_recovers():
+    client = _client([_Response(500), _Response(500), _Response(200, {"id": 1})])
+    for _ in range(2):
+        with pytest.raises(PokeAPIError):
+            client.get_json("pokemon/1")
+    with pytest.raises(CircuitOpenError):
+        client.get_json("pokemon/1")  # session not called
+    time.sleep(RESET * 1.5)
+    assert client.get_json("pokemon/1") == {"id": 1}
+    assert client.breaker.state == "closed"
+
+def test_probe_raising_something_unexpected_still_reports_back():
+    client = _client([_Response(500), _Response(500), RuntimeError("boom"), _Response(200, {"id": 1})])
+    for _ in range(2):
+        with pytest.raises(PokeAPIError):
+            client.get_json("pokemon/1")
+    time.sleep(RESET * 1.5)
+    with pytest.raises(RuntimeError):
+        client.get_json("pokemon/1")
+    # the failed probe reopened the breaker rather than leaving it stuck half-open
+    assert client.breaker.state == "open"
+    time.sleep(RESET * 1.5)
+    assert client.get_json("pokemon/1") == {"id": 1}
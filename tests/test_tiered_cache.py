@@ -0,0 +1,112 @@
+"""SingleFlight and TieredCache: coalescing, stale-while-revalidate, stale-if-error - memory only"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tiered_cache import SingleFlight, TieredCache  # noqa: E402
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+def test_followers_get_the_leaders_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", load))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    # everyone but the leader is parked on the leader's future before it finishes
+    _wait_for(lambda: flights.saved == 9)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["value"] * 10
+    assert len(calls) == 1
+    assert flights.saved == 9
+
+def test_failure_reaches_followers_and_doesnt_poison_the_key():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: flights.saved == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    # the next call for the key is a fresh flight, not the old failure
+    assert flights.do("k", lambda: "recovered") == "recovered"
+
+def test_fresh_entries_dont_call_the_loader():
+    cache = TieredCache(ttl=60, stale_ttl=60)
+    assert cache.get("k", lambda: "v1") == "v1"
+    assert cache.get("k", lambda: pytest.fail("loader called for a fresh entry")) == "v1"
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = TieredCache(ttl=10, stale_ttl=100)
+    cache.set("k", "old", fetched_at=time.time() - 20)  # past ttl, inside the stale window
+    release = threading.Event()
+
+    def reload():
+        release.wait(5)
+        return "new"
+
+    assert cache.get("k", reload) == "old"  # answered straight away, refresh in the background
+    assert cache.get("k", reload) == "old"
+    release.set()
+    _wait_for(lambda: cache.peek("k")[0] == "new")
+    assert cache.peek("k")[1] < 10
+
+def test_expired_copy_is_returned_when_the_loader_fails():
+    cache = TieredCache(ttl=10, stale_ttl=10)
+    cache.set("k", "old", fetched_at=time.time() - 60)  # past the stale window too
+
+    def fail():
+        raise ValueError("upstream down")
+
+    assert cache.get("k", fail) == "old"
+    assert not cache.usable("k")
+
+def test_loader_failure_without_a_copy_raises():
+    cache = TieredCache(ttl=10, stale_ttl=10)
+
+    def fail():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        cache.get("k", fail)
+    assert cache.peek("k") is None
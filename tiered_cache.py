@@ -0,0 +1,233 @@
+"""
+Two-tier cache: an in-memory LRU in front of a persistent SQLite file.
+
+Entries are fresh for `ttl` seconds. After that they are still served for
+another `stale_ttl` seconds while a background thread refreshes them
+(stale-while-revalidate); only past that window does a caller wait on
+the loader again, and if that load fails the expired copy is still
+returned rather than an error. The disk tier survives restarts and
+deploys, so a new process starts warm. Concurrent misses on one key share
+a single loader call (see SingleFlight).
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cachetools import LRUCache
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+class DiskCache:
+    """Key -> (json value, fetched_at) in a SQLite file, safe across threads and processes"""
+
+    def __init__(self, path, maxsize=100000, table="cache"):
+        self.path = str(path)
+        self.maxsize = maxsize
+        self.table = table  # several caches can share one file, each in its own table
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+        conn.execute(DISK_SCHEMA.format(table=table))
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._conn().execute(
+                f"SELECT value, fetched_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key, value, fetched_at):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, fetched_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, separators=(",", ":")), fetched_at)
+                )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(conn)
+        except sqlite3.Error:
+            pass  # disk tier is best effort, memory still has it
+
+    def _prune(self, conn):
+        # drop the oldest rows once we're over maxsize
+        with conn:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY fetched_at ASC"
+                f" LIMIT MAX(0, (SELECT COUNT(*) FROM {self.table}) - ?))",
+                (self.maxsize,)
+            )
+
+    def delete(self, key):
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+
+def open_disk_cache(path, maxsize=100000, table="cache"):
+    """DiskCache at path, or None (memory only) if there's no path or the file can't be opened"""
+    if not path:
+        return None
+    try:
+        return DiskCache(path, maxsize, table)
+    except sqlite3.Error as e:
+        # unwritable dir, read-only fs, corrupt file... the cache still works, it just won't persist
+        print(f"disk cache {path} ({table}) unavailable, memory only: {e}", file=sys.stderr)
+        return None
+
+class SingleFlight:
+    """Per-key call dedup: while fn is running for a key, other callers wait on it instead of calling it again"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the call in flight
+        self.saved = 0  # calls that piggybacked on someone else's
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.saved += 1
+        if not leader:
+            return future.result()  # re-raises the leader's exception
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # forget the call either way, so a failure isn't handed to the next caller
+            with self._lock:
+                self._calls.pop(key, None)
+
+class TieredCache:
+    def __init__(self, maxsize=1000, ttl=3600, stale_ttl=86400, disk_path=None,
+                 disk_maxsize=100000, disk_table="cache", refresh_workers=2, decode=None):
+        self.ttl = ttl
+        self.decode = decode  # rebuilds a value from its json form when read back from disk
+        self.stale_ttl = stale_ttl
+        self.memory = LRUCache(maxsize=maxsize)  # key -> (value, fetched_at)
+        self.disk = open_disk_cache(disk_path, disk_maxsize, disk_table)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers,
+                                             thread_name_prefix="cache-refresh")
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                if self.decode is not None:
+                    entry = (self.decode(entry[0]), entry[1])
+                with self._lock:
+                    self.memory[key] = entry  # promote
+        return entry
+
+    def peek(self, key):
+        """(value, age in seconds) without loading or refreshing anything, None if not cached"""
+        entry = self._lookup(key)
+        return None if entry is None else (entry[0], time.time() - entry[1])
+
+    def fetched_at(self, key):
+        """When the cached value for key was fetched (epoch seconds), None if not cached"""
+        entry = self._lookup(key)
+        return None if entry is None else entry[1]
+
+    def usable(self, key):
+        # would get() answer from cache (fresh or stale) without waiting on the loader?
+        entry = self.peek(key)
+        return entry is not None and entry[1] < self.ttl + self.stale_ttl
+
+    def set(self, key, value, fetched_at=None):
+        entry = (value, time.time() if fetched_at is None else fetched_at)
+        with self._lock:
+            self.memory[key] = entry
+        if self.disk is not None:
+            self.disk.set(key, *entry)
+
+    def get(self, key, loader):
+        """Cached value for key, calling loader() on a miss (None results aren't cached)"""
+        entry = self._lookup(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, loader)
+                return value
+
+        try:
+            return self._flights.do(key, lambda: self._load(key, loader))
+        except Exception:
+            if entry is None:
+                raise
+            return entry[0]  # loader failed, an expired copy still beats an error
+
+    @property
+    def coalesced(self):
+        """Loader calls saved by piggybacking on one already in flight"""
+        return self._flights.saved
+
+    def _load(self, key, loader):
+        # someone may have filled it between our lookup and getting the flight
+        entry = self._lookup(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                # through the flight so a caller whose copy fully expired joins this fetch
+                self._flights.do(key, lambda: self._load(key, loader))
+            except Exception:
+                pass  # keep serving the stale copy, next request tries again
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
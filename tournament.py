@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Round-robin tournaments on top of BattleSimulator.
+
+Every pairing in a roster is battled K times across a process pool. Species
+data is resolved once (all names fetched concurrently) through
+PokemonResource, trimmed down to what a battle reads, and handed to each
+worker once when it starts - tasks themselves are just a few ints.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from battle_simulator import BattleSimulator, np
+
+# per-worker state, filled in by _init_worker
+_table = ()
+_sim = None
+
+def compact_record(poke):
+    """Just the fields a battle needs from a get_pokemon payload"""
+    return {
+        "name": poke["name"],
+        "types": list(poke["types"]),
+        "stats": dict(poke["stats"])
+    }
+
+def worker_context():
+    """Start method for battle process pools. They're created after the fetch/cache-refresh thread
+    pools are running, and fork would copy whatever locks those threads hold - so start workers clean"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def _init_worker(table, seed):
+    global _table, _sim
+    _table = table
+    _sim = BattleSimulator(seed=seed)
+
+def _run_pairing(task):
+    # one pairing, k battles -> (i, j, i_wins, j_wins, draws)
+    pair_index, i, j, k, level = task
+    p1, p2 = _table[i], _table[j]
+
+    if np is not None:
+        result = _sim.simulate_many(p1, p2, k, level, level, battle_index=pair_index)
+        return i, j, result["pokemon1"]["wins"], result["pokemon2"]["wins"], result["draws"]
+
+    # no numpy - plain battles, each on its own sub-stream of the pairing
+    i_wins = j_wins = draws = 0
+    for r in range(k):
+        result = _sim.simulate(p1, p2, level, level, log_level="none", battle_index=pair_index * k + r)
+        if result["winner_side"] == "pokemon1":
+            i_wins += 1
+        elif result["winner_side"] == "pokemon2":
+            j_wins += 1
+        else:
+            draws += 1
+    return i, j, i_wins, j_wins, draws
+
+class Tournament:
+    def __init__(self, pokemon_api=None, seed=None, workers=None):
+        if pokemon_api is None:
+            from pokemon_resource import PokemonResource
+            pokemon_api = PokemonResource()
+        self.pokemon_api = pokemon_api
+        self.seed = BattleSimulator(seed=seed).seed
+        self.workers = workers or os.cpu_count() or 1
+
+    def resolve(self, names):
+        """Look every name up once -> (compact table, names that weren't found)"""
+        table, missing, seen = [], [], set()
+        for name, poke in zip(names, self.pokemon_api.get_pokemon_many(names)):
+            if not poke:
+                missing.append(name)
+            elif poke["name"] not in seen:
+                seen.add(poke["name"])
+                table.append(compact_record(poke))
+        return tuple(table), missing
+
+    def run(self, names, battles_per_pairing=100, level=50):
+        """Battle every pairing in the roster and return the win-rate matrix and standings"""
+        table, missing = self.resolve(names)
+        size = len(table)
+        k = int(battles_per_pairing)
+        if k < 1:
+            raise ValueError("battles_per_pairing must be at least 1")
+
+        tasks = [(pair_index, i, j, k, level)
+                 for pair_index, (i, j) in enumerate(combinations(range(size), 2))]
+
+        if self.workers == 1 or len(tasks) <= 1:
+            _init_worker(table, self.seed)
+            results = list(map(_run_pairing, tasks))
+        else:
+            workers = min(self.workers, len(tasks))
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(table, self.seed),
+                                     mp_context=worker_context()) as executor:
+                results = list(executor.map(_run_pairing, tasks, chunksize=chunksize))
+
+        wins = [[0] * size for _ in range(size)]
+        draws = [0] * size
+        for i, j, i_wins, j_wins, pair_draws in results:
+            wins[i][j] += i_wins
+            wins[j][i] += j_wins
+            draws[i] += pair_draws
+            draws[j] += pair_draws
+
+        # win_rate[i][j] = how often row i beat column j
+        win_rate = [[None if i == j else wins[i][j] / k for j in range(size)] for i in range(size)]
+
+        games = k * (size - 1)
+        standings = []
+        for i, record in enumerate(table):
+            total_wins = sum(wins[i])
+            losses = sum(wins[j][i] for j in range(size))
+            standings.append({
+                "name": record["name"],
+                "wins": total_wins,
+                "losses": losses,
+                "draws": draws[i],
+                "win_rate": total_wins / games if games else 0.0
+            })
+        standings.sort(key=lambda s: (s["win_rate"], -s["losses"]), reverse=True)
+        for rank, entry in enumerate(standings, 1):
+            entry["rank"] = rank
+
+        return {
+            "roster": [record["name"] for record in table],
+            "not_found": missing,
+            "battles_per_pairing": k,
+            "level": level,
+            "seed": self.seed,
+            "win_rate": win_rate,
+            "standings": standings
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin Pokemon tournament")
+    parser.add_argument("names", nargs="+", help="Pokemon names in the roster")
+    parser.add_argument("-k", "--battles", type=int, default=100, help="battles per pairing")
+    parser.add_argument("--level", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    args = parser.parse_args()
+
+    from pokeapi_client import PokeAPIError
+    try:
+        result = Tournament(seed=args.seed, workers=args.workers).run(args.names, args.battles, args.level)
+    except PokeAPIError as e:
+        print(f"couldn't look the roster up: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,115 @@
+"""
+Background cache warm-up.
+
+Loads a list of species into PokemonResource's cache on a background
+thread when the server starts, a few at a time, so the first users after a
+restart don't pay cold PokeAPI latency. Progress is exposed through
+status() for the server's readiness endpoint.
+
+The list comes from POKEMON_WARMUP: "off" to skip it, a comma separated
+list of names/ids, or a path to a file with one per line. The default is
+the Pokemon get_moves has hand-picked movesets for plus the frontend's
+roster (frontend/roster.py - gen 1 and the popular gen 2-4 picks). If the
+frontend isn't deployed next to the server, the whole first generation
+by id instead.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from battle_simulator import SPECIAL_MOVES
+
+try:
+    from frontend.roster import POPULAR_POKEMON, pokemon_list
+    ROSTER = pokemon_list + POPULAR_POKEMON
+except ImportError:
+    ROSTER = [str(i) for i in range(1, 152)]
+
+DEFAULT_WARMUP = list(dict.fromkeys(list(SPECIAL_MOVES) + ROSTER))
+
+def warmup_names(setting=None):
+    """Names to warm from a POKEMON_WARMUP style setting (None = the env var)"""
+    if setting is None:
+        setting = os.environ.get("POKEMON_WARMUP", "default")
+    setting = setting.strip()
+    if setting.lower() in ("", "off", "none", "0"):
+        return []
+    if setting.lower() == "default":
+        return list(DEFAULT_WARMUP)
+    if os.path.isfile(setting):
+        with open(setting) as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+        return [line for line in lines if line]
+    return [name.strip() for name in setting.split(",") if name.strip()]
+
+class WarmUp:
+    def __init__(self, pokemon_api, names, workers=4):
+        self.pokemon_api = pokemon_api
+        self.names = list(dict.fromkeys(names))
+        self.workers = max(1, workers)
+        self.loaded = 0
+        self.failed = []
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def state(self):
+        if self.finished_at is not None:
+            return "done"
+        return "running" if self.started_at is not None else "pending"
+
+    @property
+    def ready(self):
+        return self.state == "done"
+
+    def start(self):
+        """Kick the warm-up off on a daemon thread (no-op if it's already going)"""
+        if self._thread is None:
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _warm(self, name):
+        try:
+            ok = self.pokemon_api.get_pokemon(name) is not None
+        except Exception:
+            ok = False
+        with self._lock:
+            if ok:
+                self.loaded += 1
+            else:
+                self.failed.append(name)
+
+    def _run(self):
+        try:
+            # bounded so warm-up doesn't hog the connection pool or trip PokeAPI's rate limits
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+                list(pool.map(self._warm, self.names))
+        finally:
+            self.finished_at = time.time()
+
+    def status(self):
+        with self._lock:
+            done = self.loaded + len(self.failed)
+            failed = list(self.failed)
+        end = self.finished_at or time.time()
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "total": len(self.names),
+            "done": done,
+            "loaded": self.loaded,
+            "failed": failed,
+            "progress": done / len(self.names) if self.names else 1.0,
+            "elapsed_sec": round(end - self.started_at, 3) if self.started_at else 0.0
+        }